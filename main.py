@@ -16,72 +16,378 @@ License: MIT
 """
 import os
 import json
-import requests
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import atexit
+import signal
+import logging
+import logging.handlers
+import queue
+import sys
 from dotenv import load_dotenv
 import re
 
+# orjson is optional; state I/O falls back to the stdlib json module
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
+# Load .env before importing our modules; PDF extraction settings are read at import time
+load_dotenv()
+
 # Import our modular components
 from src.link_paperpile_notion import (
-    notion_create_page_with_pdf, notion_update_page, notion_query_by_uid,
-    build_drive_service
+    notion_create_page_with_pdf, notion_update_page, notion_query_by_uid, notion_query_by_uids,
+    notion_get_page_properties, resolve_authors, add_pdf_content_for_entry, build_drive_service, notion_stats, SESSION,
+    NotionPageGone
 )
 
 # Original utility functions (keeping these for now)
 from urllib.parse import urlparse, parse_qs
-import bibtexparser
-from bibtexparser.bparser import BibTexParser
 import hashlib
+import pickle
 import time
+from collections import Counter
+
+log = logging.getLogger(__name__)
 
 # Constants
 BIB_PATH = Path("data/papers.bib")
 STATE_PATH = Path("data/state.json")
+BIB_CACHE_PATH = Path("data/entries.pkl")
+BIB_CACHE_HASH_PATH = Path("data/bib_hash")
+# Stored with the bib hash; bump whenever _fast_parse_bib's output changes so
+# a parse pickled by an older tokenizer is not reused for an unchanged file
+_PARSE_CACHE_VERSION = 1
 DATA_DIR = Path("data")
 
+# Concurrent page workers; Notion throughput is capped by the client-side rate limiter
+try:
+    NOTION_MAX_WORKERS = max(1, int(os.environ.get("NOTION_MAX_WORKERS", "3")))
+except ValueError:
+    NOTION_MAX_WORKERS = 3
+STATE_CHECKPOINT_EVERY = 50
+_WORKER_LOCAL = threading.local()
+
 # Ensure data directory exists
 DATA_DIR.mkdir(exist_ok=True)
 
-def http_download_bib(url: str, output_path: Path) -> bool:
-    """Download bibliography file from URL."""
-    print(f"[download] Fetching {url}")
-    
+# Whitespace runs collapsed during normalization
+_WS = re.compile(r'\s+')
+# BLAKE2b digest size for change-tracking snapshots (distinct from legacy 16-byte MD5)
+SNAPSHOT_DIGEST_SIZE = 8
+# Translation table that strips BibTeX grouping braces in one pass
+_BRACES = str.maketrans('', '', '{}')
+
+# Generic/placeholder titles that mark an entry as not worth importing
+SKIP_TITLE_PATTERNS = [
+    "ieee xplore full-text pdf",
+    "full-text pdf",
+    "untitled",
+    "no title",
+    "unknown",
+]
+_SKIP_TITLE_RE = re.compile('|'.join(map(re.escape, SKIP_TITLE_PATTERNS)))
+
+# "Last, First Middle" author names (everything before the first comma is the last name)
+_AUTHOR_COMMA_RE = re.compile(r'(?P<last>[^,]*),\s*(?P<first>.*)')
+
+# BibTeX tokenizer patterns
+DECL_RE = re.compile(r'@(\w+)\s*', re.A)
+ENTRY_KEY_RE = re.compile(r'[{(]\s*([^,\s]+)\s*,', re.A)
+FIELD_RE = re.compile(r'\s*([\w\-]+)\s*=\s*', re.A)
+STRING_NAME_RE = re.compile(r'\s*([\w\-:]+)\s*=\s*', re.A)
+BARE_VALUE_RE = re.compile(r'[^\s,#{}()"=]+')
+# Like bibtexparser, comments and free text end at the next line starting with '@'
+COMMENT_END_RE = re.compile(r'\n\s*@')
+# Month macros predefined by bibtexparser's common_strings=True
+COMMON_STRINGS = {
+    'jan': 'January', 'feb': 'February', 'mar': 'March', 'apr': 'April',
+    'may': 'May', 'jun': 'June', 'jul': 'July', 'aug': 'August',
+    'sep': 'September', 'oct': 'October', 'nov': 'November', 'dec': 'December',
+}
+
+def http_download_bib(url: str, output_path: Path, bib_state: Optional[Dict] = None) -> bool:
+    """Download bibliography file from URL.
+    
+    ``bib_state`` holds the ETag/Last-Modified and content hash of the previous
+    download and is updated in place, so an unchanged export costs a single 304
+    round trip (or, without validators, a streamed hash comparison).
+    """
+    log.info("[download] Fetching %s", url)
+    if bib_state is None:
+        bib_state = {}
+    
+    headers = {}
+    if output_path.exists():
+        if bib_state.get('etag'):
+            headers['If-None-Match'] = bib_state['etag']
+        if bib_state.get('last_modified'):
+            headers['If-Modified-Since'] = bib_state['last_modified']
+    
+    tmp_path = output_path.with_suffix('.tmp')
     try:
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
+        with SESSION.get(url, headers=headers, stream=True, timeout=30) as resp:
+            if resp.status_code == 304:
+                log.info("[download] Not modified (304)")
+                return False
+            resp.raise_for_status()
+            
+            # Stream to a temp file while hashing, instead of buffering the body
+            hasher = hashlib.blake2b(digest_size=16)
+            with open(tmp_path, 'wb') as f:
+                for chunk in resp.iter_content(chunk_size=1 << 16):
+                    hasher.update(chunk)
+                    f.write(chunk)
+            
+            bib_state['etag'] = resp.headers.get('ETag', '')
+            bib_state['last_modified'] = resp.headers.get('Last-Modified', '')
         
         # Check if content was modified
-        if output_path.exists():
-            existing_content = output_path.read_bytes()
-            if existing_content == resp.content:
-                print(f"[download] Not modified (304)")
-                return False
+        digest = hasher.hexdigest()
+        if output_path.exists() and bib_state.get('hash') == digest:
+            tmp_path.unlink()
+            log.info("[download] Not modified (same content)")
+            return False
         
-        output_path.write_bytes(resp.content)
-        print(f"[download] Saved to {output_path}")
+        os.replace(tmp_path, output_path)
+        bib_state['hash'] = digest
+        log.info("[download] Saved to %s", output_path)
         return True
         
     except Exception as e:
-        print(f"[download] Error: {e}")
+        log.error("[download] Error: %s", e)
+        if tmp_path.exists():
+            tmp_path.unlink()
         return False
 
-def parse_bibtex(bib_path: Path) -> List[Dict]:
-    """Parse BibTeX file and return list of entries."""
-    print(f"[bib] Loading {bib_path}")
+def hash_file(path: Path) -> str:
+    """Hash a file in chunks, matching the digest http_download_bib records."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _scan_braced(text: str, pos: int) -> int:
+    """Return the index just past the brace group opened at text[pos]."""
+    depth = 0
+    for i in range(pos, len(text)):
+        c = text[i]
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(text)
+
+def _scan_quoted(text: str, pos: int) -> int:
+    """Return the index just past the quoted string opened at text[pos]."""
+    depth = 0
+    for i in range(pos + 1, len(text)):
+        c = text[i]
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+        elif c == '"' and depth <= 0:
+            return i + 1
+    return len(text)
+
+def _strip_after_newlines(value: str) -> str:
+    """Drop the indentation of continuation lines, as bibtexparser 1.x did.
+    
+    UIDs without a DOI/URL hash the raw title and author, so wrapped values
+    must come out exactly as they did before the fast tokenizer.
+    """
+    lines = value.splitlines()
+    if len(lines) > 1:
+        lines = [lines[0]] + [line.lstrip() for line in lines[1:]]
+    return '\n'.join(lines)
+
+def _read_value(text: str, pos: int, macros: Dict[str, str], unknown: set,
+                strip: bool = True) -> tuple:
+    """Read a (possibly '#'-concatenated) field value starting at pos.
+    
+    Bare names are expanded from ``macros``; undefined ones are kept verbatim
+    and added to ``unknown``. ``strip=False`` keeps continuation indentation,
+    as bibtexparser did for @string definitions.
+    """
+    clean = _strip_after_newlines if strip else str
+    parts = []
+    n = len(text)
+    while pos < n:
+        c = text[pos]
+        if c == '{':
+            end = _scan_braced(text, pos)
+            parts.append(clean(text[pos + 1:end - 1]))
+        elif c == '"':
+            end = _scan_quoted(text, pos)
+            parts.append(clean(text[pos + 1:end - 1]))
+        else:
+            m = BARE_VALUE_RE.match(text, pos)
+            if not m:
+                break
+            end = m.end()
+            name = m.group(0)
+            if name.isdigit():
+                parts.append(name)
+            elif name.lower() in macros:
+                parts.append(macros[name.lower()])
+            else:
+                unknown.add(name)
+                parts.append(name)
+        pos = end
+        # Skip whitespace and look for string concatenation
+        while pos < n and text[pos].isspace():
+            pos += 1
+        if pos < n and text[pos] == '#':
+            pos += 1
+            while pos < n and text[pos].isspace():
+                pos += 1
+            continue
+        break
+    value = ''.join(parts)
+    # bibtexparser mapped an empty group ("{}") to an empty string
+    return ('' if value == '{}' else value), pos
+
+def _skip_comment(text: str, pos: int) -> int:
+    """Skip a comment or free text starting at pos, up to the next line that starts with '@'."""
+    end = COMMENT_END_RE.search(text, pos + 1)
+    return end.end() - 1 if end else len(text)
+
+def _fast_parse_bib(text: str) -> List[Dict]:
+    """Tokenize BibTeX source in a single forward pass.
+
+    Returns raw entry dicts with ``ENTRYTYPE``, ``ID`` and lowercased field
+    names, the same shape ``normalize_entry`` expects, plus ``_raw_hash`` of
+    the entry's source text for cheap unchanged-entry detection. Like
+    bibtexparser, @string macros (and month names) are expanded, entries may
+    use ``(...)`` delimiters, and @comment, @preamble and free text are skipped.
+    """
+    entries = []
+    macros = dict(COMMON_STRINGS)
+    user_macros = False
+    unknown = set()
+    pos = 0
+    n = len(text)
+    while pos < n:
+        while pos < n and text[pos].isspace():
+            pos += 1
+        match = DECL_RE.match(text, pos)
+        decl = match.group(1).lower() if match else 'comment'
+        if decl == 'comment' or match.end() >= n or text[match.end()] not in '{(':
+            pos = _skip_comment(text, pos)
+            continue
+        pos = match.end()
+        close = '}' if text[pos] == '{' else ')'
+        
+        if decl in ('string', 'preamble'):
+            # @string defines a macro for later values; @preamble is only read past
+            name = STRING_NAME_RE.match(text, pos + 1) if decl == 'string' else None
+            pos = name.end() if name else pos + 1
+            while pos < n and text[pos].isspace():
+                pos += 1
+            value, pos = _read_value(text, pos, macros, unknown, strip=False)
+            if name:
+                macros[name.group(1).lower()] = value
+                user_macros = True
+            while pos < n and text[pos].isspace():
+                pos += 1
+            if pos < n and text[pos] == close:
+                pos += 1
+            continue
+        
+        key = ENTRY_KEY_RE.match(text, pos)
+        if not key:
+            pos = _skip_comment(text, match.start())
+            continue
+        entry = {'ENTRYTYPE': decl, 'ID': key.group(1)}
+        pos = key.end()
+        while pos < n:
+            # Skip separators between fields
+            while pos < n and (text[pos].isspace() or text[pos] == ','):
+                pos += 1
+            if pos >= n or text[pos] == close:
+                pos += 1
+                break
+            field = FIELD_RE.match(text, pos)
+            if not field:
+                # Malformed entry - resync at the next line starting with '@'
+                break
+            value, pos = _read_value(text, field.end(), macros, unknown)
+            entry[field.group(1).lower()] = value
+        
+        entry_text = text[match.start():pos]
+        if user_macros:
+            # Fold in expanded values so an edited @string still counts as a change
+            entry_text += repr(sorted(entry.items()))
+        entry['_raw_hash'] = hashlib.blake2b(entry_text.encode('utf-8'), digest_size=8).hexdigest()
+        entries.append(entry)
+    
+    if unknown:
+        log.warning("[bib] Undefined @string macros kept as literal text: %s", ", ".join(sorted(unknown)))
+    return entries
+
+def load_raw_entries(bib_path: Path, bib_hash: Optional[str] = None) -> List[Dict]:
+    """Tokenize the bib file, reusing the on-disk parse cache when its hash matches."""
+    cache_key = f"{_PARSE_CACHE_VERSION}:{bib_hash}"
+    if bib_hash and BIB_CACHE_PATH.exists() and BIB_CACHE_HASH_PATH.exists():
+        try:
+            if BIB_CACHE_HASH_PATH.read_text() == cache_key:
+                raw_entries = pickle.loads(BIB_CACHE_PATH.read_bytes())
+                log.info("[bib] Loaded %s entries from parse cache", len(raw_entries))
+                return raw_entries
+        except Exception as e:
+            log.warning("[bib] Ignoring unreadable parse cache: %s", e)
     
-    with open(bib_path, 'r', encoding='utf-8') as f:
-        parser = BibTexParser(common_strings=True)
-        bib_db = parser.parse_file(f)
+    raw_entries = _fast_parse_bib(bib_path.read_text('utf-8'))
     
-    entries = []
-    for entry in bib_db.entries:
+    if bib_hash:
+        try:
+            # Invalidate first so a partial write can never be paired with a valid hash
+            BIB_CACHE_HASH_PATH.unlink(missing_ok=True)
+            BIB_CACHE_PATH.write_bytes(pickle.dumps(raw_entries, protocol=pickle.HIGHEST_PROTOCOL))
+            BIB_CACHE_HASH_PATH.write_text(cache_key)
+        except Exception as e:
+            log.error("[bib] Failed to write parse cache: %s", e)
+    
+    return raw_entries
+
+def parse_bibtex(bib_path: Path, prev_entries: Optional[Dict] = None,
+                 bib_hash: Optional[str] = None) -> Iterator[Dict]:
+    """Parse BibTeX file and yield normalized entries.
+    
+    When ``prev_entries`` (the per-UID state map) is given, entries whose raw
+    source text is byte-identical to the last sync are skipped before
+    normalization, since they cannot have changed. ``bib_hash`` enables the
+    on-disk cache of the tokenized file.
+    """
+    log.info("[bib] Loading %s", bib_path)
+    
+    raw_entries = load_raw_entries(bib_path, bib_hash)
+    
+    unchanged = 0
+    for entry in raw_entries:
+        if prev_entries:
+            prev = prev_entries.get(generate_uid(entry))
+            if prev and prev.get('raw_hash') == entry['_raw_hash']:
+                unchanged += 1
+                continue
+        
         # Normalize entry
         normalized = normalize_entry(entry)
         if normalized:
-            entries.append(normalized)
+            normalized['_raw_hash'] = entry['_raw_hash']
+            yield normalized
     
-    return entries
+    if unchanged:
+        log.info("[bib] %s entries unchanged since last sync (skipped)", unchanged)
 
 def normalize_entry(entry: Dict) -> Optional[Dict]:
     """Normalize a BibTeX entry."""
@@ -91,16 +397,15 @@ def normalize_entry(entry: Dict) -> Optional[Dict]:
         return None
     
     # Clean title - remove braces and normalize whitespace
-    import re
-    title = title.replace('{', '').replace('}', '')
-    title = re.sub(r'\s+', ' ', title).strip()
+    title = title.translate(_BRACES)
+    title = _WS.sub(' ', title).strip()
     
     # Extract authors
     authors = []
     author_str = entry.get('author', '')
     if author_str:
         # Clean up the author string first - normalize whitespace and remove line breaks
-        author_str = re.sub(r'\s+', ' ', author_str.strip())
+        author_str = _WS.sub(' ', author_str.strip())
         
         # Improved author parsing
         author_names = author_str.split(' and ')
@@ -123,8 +428,8 @@ def normalize_entry(entry: Dict) -> Optional[Dict]:
     
     # Extract venue - normalize whitespace
     venue = entry.get('booktitle') or entry.get('journal') or entry.get('publisher', '')
-    venue = venue.strip().replace('{', '').replace('}', '')
-    venue = re.sub(r'\s+', ' ', venue).strip()
+    venue = venue.strip().translate(_BRACES)
+    venue = _WS.sub(' ', venue).strip()
     
     # Generate UID
     uid = generate_uid(entry)
@@ -178,65 +483,110 @@ def generate_uid(entry: Dict) -> str:
     hash_obj = hashlib.md5(content.encode('utf-8'))
     return f"hash:{hash_obj.hexdigest()[:12]}"
 
+def _normalize_text(text) -> str:
+    """Collapse whitespace (including newlines) into single spaces."""
+    if not text:
+        return ''
+    return _WS.sub(' ', str(text).strip())
+
 def tracked_snapshot(entry: Dict) -> str:
     """Create a snapshot hash for tracking changes."""
-    # Normalize text fields by removing extra whitespace and newlines
-    def normalize_text(text):
-        if not text:
-            return ''
-        # Replace multiple whitespace (including newlines) with single spaces
-        import re
-        return re.sub(r'\s+', ' ', str(text).strip())
+    year = entry.get('year')
+    content = '\x1f'.join([
+        _normalize_text(entry.get('title', '')),
+        '\x1e'.join(_normalize_text(a.get('full', '')) for a in entry.get('authors', [])),
+        '' if year is None else str(year),
+        _normalize_text(entry.get('venue', '')),
+        _normalize_text(entry.get('doi', '')),
+        _normalize_text(entry.get('url', '')),
+    ])
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=SNAPSHOT_DIGEST_SIZE).hexdigest()
+
+def _legacy_snapshot(entry: Dict) -> str:
+    """Snapshot format used before BLAKE2b, kept to compare against old state files.
     
+    This must keep using stdlib json: the hash depends on its exact output.
+    """
     trackable = {
-        'title': normalize_text(entry.get('title', '')),
-        'authors': [normalize_text(a.get('full', '')) for a in entry.get('authors', [])],
+        'title': _normalize_text(entry.get('title', '')),
+        'authors': [_normalize_text(a.get('full', '')) for a in entry.get('authors', [])],
         'year': entry.get('year'),
-        'venue': normalize_text(entry.get('venue', '')),
-        'doi': normalize_text(entry.get('doi', '')),
-        'url': normalize_text(entry.get('url', '')),
+        'venue': _normalize_text(entry.get('venue', '')),
+        'doi': _normalize_text(entry.get('doi', '')),
+        'url': _normalize_text(entry.get('url', '')),
     }
     content = json.dumps(trackable, sort_keys=True)
     return hashlib.md5(content.encode('utf-8')).hexdigest()
 
+def _json_loads(data: bytes):
+    """Decode JSON, using orjson when it is installed."""
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps_pretty(obj) -> bytes:
+    """Encode JSON with 2-space indentation, using orjson when it is installed."""
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
 def load_state() -> Dict:
-    """Load previous state."""
+    """Load previous state.
+    
+    State layout is ``{"bib": {...download validators...}, "entries": {uid: {...}}}``;
+    legacy files that only contain the per-entry map are upgraded on load.
+    """
+    state = {"bib": {}, "entries": {}}
     if STATE_PATH.exists():
         try:
-            with open(STATE_PATH, 'r') as f:
-                state = json.load(f)
-            print(f"[state] Loaded state with {len(state)} entries")
-            return state
+            with open(STATE_PATH, 'rb') as f:
+                loaded = _json_loads(f.read())
+            if "entries" in loaded:
+                state["bib"] = loaded.get("bib", {})
+                state["entries"] = loaded["entries"]
+            else:
+                state["entries"] = loaded
+            log.info("[state] Loaded state with %s entries", len(state['entries']))
         except Exception as e:
-            print(f"[state] Error loading state: {e}")
+            log.error("[state] Error loading state: %s", e)
     else:
-        print(f"[state] No state file found, starting fresh")
-    return {}
+        log.info("[state] No state file found, starting fresh")
+    return state
 
 def save_state(state: Dict) -> None:
-    """Save current state."""
+    """Save current state atomically (write to a temp file, then rename)."""
+    tmp_path = STATE_PATH.with_suffix('.json.tmp')
     try:
-        with open(STATE_PATH, 'w') as f:
-            json.dump(state, f, indent=2)
-        print(f"[state] Saved state with {len(state)} entries")
+        with open(tmp_path, 'wb') as f:
+            f.write(_json_dumps_pretty(state))
+        os.replace(tmp_path, STATE_PATH)
+        log.info("[state] Saved state with %s entries", len(state['entries']))
     except Exception as e:
-        print(f"[state] Error saving state: {e}")
+        log.error("[state] Error saving state: %s", e)
 
 def diff_entries(prev_state: Dict, current_entries: List[Dict]) -> tuple:
     """Find new and updated entries."""
+    prev_snapshots = {uid: v.get('snapshot', '') for uid, v in prev_state.items()}
     new_items = []
     updated_items = []
+    seen = set()
     
     for entry in current_entries:
         uid = entry['uid']
-        current_snapshot = tracked_snapshot(entry)
+        # Duplicate bib records map to the same page; process each UID once
+        if uid in seen:
+            continue
+        seen.add(uid)
         
-        if uid not in prev_state:
+        prev_snapshot = prev_snapshots.get(uid)
+        if prev_snapshot is None:
             new_items.append(entry)
-        else:
-            prev_snapshot = prev_state[uid].get('snapshot', '')
-            if prev_snapshot != current_snapshot:
+        elif len(prev_snapshot) != SNAPSHOT_DIGEST_SIZE * 2:
+            # MD5 snapshot from an older state file; it is rewritten once unchanged
+            if prev_snapshot != _legacy_snapshot(entry):
                 updated_items.append(entry)
+        elif prev_snapshot != entry['_snapshot']:
+            updated_items.append(entry)
     
     return new_items, updated_items
 
@@ -248,15 +598,7 @@ def is_valid_entry(entry: Dict) -> bool:
         return False
     
     # Skip entries with generic/placeholder titles
-    skip_patterns = [
-        "ieee xplore full-text pdf",
-        "full-text pdf",
-        "untitled",
-        "no title",
-        "unknown",
-    ]
-    title_lower = title.lower()
-    if any(pattern in title_lower for pattern in skip_patterns):
+    if _SKIP_TITLE_RE.search(title.lower()):
         return False
     
     # Must have at least one of: year, authors, venue, doi, url
@@ -272,80 +614,172 @@ def is_valid_entry(entry: Dict) -> bool:
 
 def parse_author_name(name: str) -> Optional[Dict]:
     """Parse a single author name into first, last, and full components."""
-    name = name.strip()
+    # Clean up common artifacts
+    name = _WS.sub(' ', name.translate(_BRACES)).strip()
     if not name:
         return None
     
-    # Clean up common artifacts
-    name = name.replace('{', '').replace('}', '')
-    name = re.sub(r'\s+', ' ', name).strip()
-    
-    # Handle "Last, First Middle" format
-    if ',' in name:
-        parts = name.split(',', 1)
-        last = parts[0].strip()
-        first_part = parts[1].strip() if len(parts) > 1 else ''
-        
-        # Clean and organize first/middle names
-        if first_part:
-            # Handle cases like "First Middle" or "F. M."
-            first_names = first_part.split()
-            if first_names:
-                first = first_names[0]
-                # Include middle names/initials in first name
-                if len(first_names) > 1:
-                    first = ' '.join(first_names)
-            else:
-                first = first_part
-        else:
-            first = ''
-        
+    # "Last, First Middle" format
+    match = _AUTHOR_COMMA_RE.match(name)
+    if match:
+        last = match.group('last').strip()
+        first = match.group('first')
         full_name = f"{first} {last}".strip() if first else last
-        
         return {
             'last': last,
             'first': first,
             'full': full_name
         }
     
-    # Handle "First Middle Last" format
+    # "First Middle Last" format - last word is the last name, the rest is
+    # the first name (a single word is treated as the last name)
+    first, _, last = name.rpartition(' ')
+    return {
+        'last': last,
+        'first': first,
+        'full': name
+    }
+
+def _state_record(e: Dict) -> Dict:
+    """Per-entry state persisted between runs."""
+    return {"snapshot": e['_snapshot'], "raw_hash": e.get('_raw_hash')}
+
+def _thread_drive_service(service):
+    """Return a Drive service owned by the calling worker thread.
+    
+    googleapiclient services are not thread-safe, so each worker builds its own
+    once the shared service has shown that credentials are available.
+    """
+    if service is None:
+        return None
+    if not hasattr(_WORKER_LOCAL, 'service'):
+        _WORKER_LOCAL.service = build_drive_service()
+    return _WORKER_LOCAL.service
+
+def _update_or_recreate(e: Dict, page_id: str, notion_token: str, notion_db: str,
+                        authors_db: Optional[str], service,
+                        authors_index: Optional[Dict[str, str]],
+                        page_properties: Dict[str, Dict]) -> Optional[str]:
+    """Update the entry's page, finding or recreating it if it was deleted in Notion.
+    
+    Returns the ID of the page that was updated, or None if a new page (with its
+    PDF content) had to be created instead.
+    """
+    try:
+        if e["uid"] not in page_properties:
+            # Resolved from the ID cache without a query; fetch what the skip checks compare against
+            current = notion_get_page_properties(notion_token, page_id)
+            if current is not None:
+                page_properties[e["uid"]] = current
+        notion_update_page(notion_token, page_id, e, authors_db, authors_index=authors_index,
+                           current=page_properties.get(e["uid"]))
+        return page_id
+    except NotionPageGone:
+        log.warning("   ⚠️  Page was deleted in Notion, looking it up again")
+    
+    # The fetched properties belonged to the deleted page
+    page_properties.pop(e["uid"], None)
+    page_id = notion_query_by_uid(notion_token, notion_db, e["uid"])
+    if page_id:
+        notion_update_page(notion_token, page_id, e, authors_db, authors_index=authors_index)
+        return page_id
+    log.warning("   ⚠️  Page missing, creating new one")
+    notion_create_page_with_pdf(notion_token, notion_db, e, authors_db, service, authors_index)
+    return None
+
+def _process_new(e: Dict, i: int, total: int, notion_token: str, notion_db: str,
+                 authors_db: Optional[str], service, uid_index: Dict[str, str],
+                 authors_index: Optional[Dict[str, str]],
+                 page_properties: Dict[str, Dict]) -> Tuple[str, str, Dict]:
+    """Create (or update, if it already exists) the Notion page for a new entry."""
+    log.info("\n📄 [NEW %s/%s] Processing: %s...", i, total, e.get('title', 'Unknown')[:60])
+    service = _thread_drive_service(service)
+    
+    page_id = uid_index.get(e["uid"])
+    if page_id:
+        log.warning("   ⚠️  Page already exists, updating instead")
+        page_id = _update_or_recreate(e, page_id, notion_token, notion_db, authors_db, service,
+                                      authors_index, page_properties)
+        action = 'modified' if page_id else 'created'
+    else:
+        # Create page with integrated PDF processing
+        notion_create_page_with_pdf(notion_token, notion_db, e, authors_db, service, authors_index)
+        action = 'created'
+    
+    return action, e["uid"], _state_record(e)
+
+def _process_updated(e: Dict, i: int, total: int, notion_token: str, notion_db: str,
+                     authors_db: Optional[str], service, uid_index: Dict[str, str],
+                     authors_index: Optional[Dict[str, str]],
+                     page_properties: Dict[str, Dict]) -> Tuple[str, str, Dict]:
+    """Update (or recreate, if it is missing) the Notion page for a changed entry."""
+    log.info("\n🔄 [UPDATE %s/%s] Processing: %s...", i, total, e.get('title', 'Unknown')[:60])
+    service = _thread_drive_service(service)
+    
+    page_id = uid_index.get(e["uid"])
+    if not page_id:
+        log.warning("   ⚠️  Page missing, creating new one")
+        notion_create_page_with_pdf(notion_token, notion_db, e, authors_db, service, authors_index)
+        action = 'created'
     else:
-        parts = name.split()
-        if len(parts) == 1:
-            # Single name - treat as last name
-            return {
-                'last': parts[0],
-                'first': '',
-                'full': parts[0]
-            }
-        elif len(parts) == 2:
-            # Two parts: "First Last"
-            return {
-                'last': parts[1],
-                'first': parts[0],
-                'full': name
-            }
-        else:
-            # Multiple parts: "First Middle Last" or "First Middle1 Middle2 Last"
-            # Take last part as last name, everything else as first name
-            last = parts[-1]
-            first = ' '.join(parts[:-1])
-            
-            return {
-                'last': last,
-                'first': first,
-                'full': name
-            }
+        # Update page metadata
+        page_id = _update_or_recreate(e, page_id, notion_token, notion_db, authors_db, service,
+                                      authors_index, page_properties)
+        action = 'modified' if page_id else 'created'
+    
+    if action == 'modified':
+        # Immediately process PDF content for this entry
+        log.info("   📄 Adding PDF content...")
+        try:
+            add_pdf_content_for_entry(notion_token, notion_db, service, e, page_id,
+                                      page_properties.get(e["uid"]))
+            log.info("   ✅ PDF content processing completed")
+        except Exception as pdf_error:
+            log.error("   ⚠️  PDF processing failed: %s", pdf_error)
+    
+    return action, e["uid"], _state_record(e)
+
+def _stop_and_record(executor: ThreadPoolExecutor, futures: List, curr_state: Dict) -> None:
+    """Cancel queued work and record every entry that has already finished.
+    
+    Entries still running cannot be interrupted; their results are recorded
+    when they complete, before the atexit state flush.
+    """
+    # Cancel explicitly rather than via shutdown(cancel_futures=True), which needs Python 3.9
+    for future in futures:
+        future.cancel()
+    executor.shutdown(wait=False)
+    
+    def on_done(future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            _, uid, record = future.result()
+            curr_state[uid] = record
+    
+    for future in futures:
+        future.add_done_callback(on_done)
+
+def _exit_on_sigterm(signum, frame) -> None:
+    """Turn SIGTERM into a normal exit so atexit handlers flush state."""
+    raise SystemExit(128 + signum)
 
-def quiet_log(message: str, quiet_mode: bool = False):
-    """Log message only if not in quiet mode."""
-    if not quiet_mode:
-        print(message)
+def setup_logging(quiet_mode: bool = False) -> logging.handlers.QueueListener:
+    """Route log records through a queue so workers never block on stdout."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+    # Quiet mode silences the per-entry PDF/Notion chatter but keeps warnings and the summary
+    logging.getLogger("src.link_paperpile_notion").setLevel(logging.WARNING if quiet_mode else logging.INFO)
+    listener.start()
+    # Registered before save_state, so the listener stops (and drains) after the final flush
+    atexit.register(listener.stop)
+    return listener
 
 def main() -> None:
     """Main processing function."""
-    load_dotenv()
-    
     # Configuration
     export_url = os.environ.get("PAPERPILE_EXPORT_URL")
     notion_token = os.environ.get("NOTION_TOKEN")
@@ -357,10 +791,14 @@ def main() -> None:
     
     # Quiet mode: set QUIET_MODE=true to reduce verbose logging
     quiet_mode = os.environ.get("QUIET_MODE", "").lower() in ("true", "1", "yes")
+    setup_logging(quiet_mode)
     
     # Limited processing mode
     limit_mode = os.environ.get("LIMIT_MODE", "").lower() in ("true", "1", "yes")
     limit_count = int(os.environ.get("LIMIT_COUNT", "10"))
+    
+    # Force refresh: set FORCE_REFRESH=true to re-diff even if the bib file is unchanged
+    force_refresh = os.environ.get("FORCE_REFRESH", "").lower() in ("true", "1", "yes")
 
     # Validation
     if not export_url:
@@ -368,80 +806,117 @@ def main() -> None:
     if not test_mode and (not notion_token or not notion_db):
         raise SystemExit("NOTION_TOKEN and NOTION_DB_ID are required (unless TEST_MODE=true)")
 
-    print(f"[config] export_url={export_url}")
-    print(f"[config] test_mode={test_mode}")
+    log.info("[config] export_url=%s", export_url)
+    log.info("[config] test_mode=%s", test_mode)
     if limit_mode:
-        print(f"[config] limit_mode=true, processing only {limit_count} entries")
+        log.info("[config] limit_mode=true, processing only %s entries", limit_count)
 
     # Download and parse bibliography
-    updated = http_download_bib(export_url, BIB_PATH)
+    state = load_state()
+    updated = http_download_bib(export_url, BIB_PATH, state["bib"])
     if not updated and not BIB_PATH.exists():
         raise SystemExit("Failed to download and no existing bib present")
 
-    entries = parse_bibtex(BIB_PATH)
-    print(f"[bib] parsed entries: {len(entries)}")
-    
-    # Filter out invalid/empty entries
-    valid_entries = [e for e in entries if is_valid_entry(e)]
-    skipped_count = len(entries) - len(valid_entries)
-    print(f"[filter] valid entries: {len(valid_entries)} (skipped {skipped_count} empty/invalid)")
+    # Skip the whole pipeline if this exact bib file was already fully synced
+    bib_hash = state["bib"].get("hash") or hash_file(BIB_PATH)
+    state["bib"]["hash"] = bib_hash
+    if not test_mode and not force_refresh and bib_hash == state["bib"].get("synced_hash"):
+        log.info("[bib] Unchanged since last completed sync - nothing to do")
+        save_state(state)
+        return
+
+    # Parse, normalize and filter out invalid/empty entries in a single pass.
+    # Test mode previews the whole library; otherwise skip byte-identical entries
+    parsed_count = 0
+    valid_entries = []
+    for e in parse_bibtex(BIB_PATH, None if test_mode else state["entries"], bib_hash):
+        parsed_count += 1
+        if is_valid_entry(e):
+            valid_entries.append(e)
+    valid_entries = tuple(valid_entries)
+    log.info("[bib] parsed entries: %s", parsed_count)
+    skipped_count = parsed_count - len(valid_entries)
+    log.info("[filter] valid entries: %s (skipped %s empty/invalid)", len(valid_entries), skipped_count)
     
     entries = valid_entries
     
     # Apply limit if enabled
     if limit_mode and len(entries) > limit_count:
         entries = entries[:limit_count]
-        print(f"[limit] processing {len(entries)} entries (limited from {len(valid_entries)})")
-    
-    # Show preview
-    if entries:
-        preview_entry = entries[0]
-        for e in entries[:5]:
-            if e.get('title') and len(e.get('title', '')) > 10 and e.get('year'):
-                preview_entry = e
-                break
+        log.info("[limit] processing %s entries (limited from %s)", len(entries), len(valid_entries))
+    
+    # Show preview (skipped in quiet mode)
+    if entries and not quiet_mode:
+        e = next(
+            (e for e in entries[:5] if e.get('title') and len(e['title']) > 10 and e.get('year')),
+            entries[0]
+        )
         
-        print(f"\n[preview] Sample entry:")
-        e = preview_entry
-        print(f"  Title: {e.get('title', 'N/A')}")
-        print(f"  Type: {e.get('type_norm', 'N/A')} (from {e.get('entrytype', 'N/A')})")
-        print(f"  Year: {e.get('year', 'N/A')}")
-        print(f"  Authors: {[a['full'] for a in e.get('authors', [])]}")
-        print(f"  Venue: {e.get('venue', 'N/A')}")
-        print(f"  DOI: {e.get('doi', 'N/A')}")
-        print(f"  UID: {e.get('uid', 'N/A')}")
+        log.info("\n[preview] Sample entry:")
+        log.info("  Title: %s", e.get('title', 'N/A'))
+        log.info("  Type: %s (from %s)", e.get('type_norm', 'N/A'), e.get('entrytype', 'N/A'))
+        log.info("  Year: %s", e.get('year', 'N/A'))
+        log.info("  Authors: %s", [a['full'] for a in e.get('authors', [])])
+        log.info("  Venue: %s", e.get('venue', 'N/A'))
+        log.info("  DOI: %s", e.get('doi', 'N/A'))
+        log.info("  UID: %s", e.get('uid', 'N/A'))
         
         if len(entries) > 1:
-            type_stats = {}
+            # Gather all stats in a single pass over the entries
+            type_stats = Counter()
+            year_count, min_year, max_year = 0, None, None
+            with_authors, with_doi = 0, 0
             for entry in entries:
-                type_norm = entry.get('type_norm', 'Unknown')
-                type_stats[type_norm] = type_stats.get(type_norm, 0) + 1
+                type_stats[entry.get('type_norm', 'Unknown')] += 1
+                year = entry.get('year')
+                if year:
+                    year_count += 1
+                    min_year = year if min_year is None else min(min_year, year)
+                    max_year = year if max_year is None else max(max_year, year)
+                if entry.get('authors'):
+                    with_authors += 1
+                if entry.get('doi'):
+                    with_doi += 1
             
-            print(f"\n[stats] Entry types: {dict(sorted(type_stats.items()))}")
-            years = [e.get('year') for e in entries if e.get('year')]
-            if years:
-                print(f"[stats] Year range: {min(years)}-{max(years)} ({len(years)} entries with years)")
-            print(f"[stats] Entries with authors: {sum(1 for e in entries if e.get('authors'))}")
-            print(f"[stats] Entries with DOI: {sum(1 for e in entries if e.get('doi'))}")
+            log.info("\n[stats] Entry types: %s", dict(sorted(type_stats.items())))
+            if year_count:
+                log.info("[stats] Year range: %s-%s (%s entries with years)", min_year, max_year, year_count)
+            log.info("[stats] Entries with authors: %s", with_authors)
+            log.info("[stats] Entries with DOI: %s", with_doi)
     
     if test_mode:
-        print(f"\n[test] TEST_MODE enabled - skipping Notion operations")
-        print(f"[test] Would process {len(entries)} entries")
+        log.info("\n[test] TEST_MODE enabled - skipping Notion operations")
+        log.info("[test] Would process %s entries", len(entries))
         return
 
+    # Compute each entry's change-tracking snapshot once
+    for e in entries:
+        e['_snapshot'] = tracked_snapshot(e)
+
     # Determine what needs to be processed
-    prev_state = load_state()
-    new_items, updated_items = diff_entries(prev_state, entries)
-    print(f"[diff] new={len(new_items)} updated={len(updated_items)} (of {len(entries)})")
+    curr_state = state["entries"]  # Updated in place and flushed by save_state
+    new_items, updated_items = diff_entries(curr_state, entries)
+    log.info("[diff] new=%s updated=%s (of %s)", len(new_items), len(updated_items), len(entries))
 
-    # Build current state map - preserve existing state and only update changed entries
-    curr_state = prev_state.copy()  # Start with existing state
-    
-    # Update snapshots for all current entries (in case of changes)
+    # Refresh snapshots for unchanged entries; pending ones are recorded as they finish
+    pending_uids = {e["uid"] for e in new_items + updated_items}
     for e in entries:
-        curr_state[e["uid"]] = {"snapshot": tracked_snapshot(e)}
+        if e["uid"] not in pending_uids:
+            curr_state[e["uid"]] = _state_record(e)
     
-    print(f"[state] Starting processing with {len(curr_state)} entries tracked")
+    log.info("[state] Starting processing with %s entries tracked", len(curr_state))
+
+    # Flush progress if the run is interrupted; SIGTERM would otherwise skip atexit
+    atexit.register(save_state, state)
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
+    # Resolve existing pages for just the pending entries with batched queries
+    # and keep their current properties so unchanged pages are not re-patched
+    page_properties = {}
+    uid_index = notion_query_by_uids(notion_token, notion_db, sorted(pending_uids), page_properties) if pending_uids else {}
+    
+    # Resolve (or create) every pending entry's authors once; workers add any stragglers
+    authors_index = resolve_authors(notion_token, authors_db, new_items + updated_items) if authors_db and pending_uids else None
 
     # Build Drive service once for all operations
     service = build_drive_service()
@@ -449,69 +924,55 @@ def main() -> None:
     # Process entries with integrated PDF processing
     created, modified = 0, 0
     
-    print(f"\n🚀 [PROCESSING] Starting unified PDF processing for {len(new_items + updated_items)} entries...")
+    log.info("\n🚀 [PROCESSING] Starting unified PDF processing for %s entries...", len(new_items + updated_items))
     
-    # Process new items
-    for i, e in enumerate(new_items, 1):
-        print(f"\n📄 [NEW {i}/{len(new_items)}] Processing: {e.get('title', 'Unknown')[:60]}...")
-        
-        page_id = notion_query_by_uid(notion_token, notion_db, e["uid"])
-        if page_id:
-            print(f"   ⚠️  Page already exists, updating instead")
-            notion_update_page(notion_token, page_id, e, authors_db)
-            modified += 1
-        else:
-            # Create page with integrated PDF processing
-            notion_create_page_with_pdf(notion_token, notion_db, e, authors_db, service)
-            created += 1
-        
-        # Update state immediately after processing each entry
-        curr_state[e["uid"]] = {"snapshot": tracked_snapshot(e)}
-        
-        # Save only this entry's update to preserve existing state
-        updated_state = load_state()  # Load current state from disk
-        updated_state[e["uid"]] = {"snapshot": tracked_snapshot(e)}  # Update this entry
-        save_state(updated_state)  # Save back
-        print(f"   💾 Updated state for: {e['uid']}")
-    
-    # Process updated items
-    for i, e in enumerate(updated_items, 1):
-        print(f"\n🔄 [UPDATE {i}/{len(updated_items)}] Processing: {e.get('title', 'Unknown')[:60]}...")
-        
-        page_id = notion_query_by_uid(notion_token, notion_db, e["uid"])
-        if not page_id:
-            print(f"   ⚠️  Page missing, creating new one")
-            notion_create_page_with_pdf(notion_token, notion_db, e, authors_db, service)
-            created += 1
-        else:
-            # Update page metadata
-            notion_update_page(notion_token, page_id, e, authors_db)
-            modified += 1
+    executor = ThreadPoolExecutor(max_workers=NOTION_MAX_WORKERS)
+    futures = [
+        executor.submit(_process_new, e, i, len(new_items), notion_token, notion_db, authors_db, service, uid_index, authors_index, page_properties)
+        for i, e in enumerate(new_items, 1)
+    ] + [
+        executor.submit(_process_updated, e, i, len(updated_items), notion_token, notion_db, authors_db, service, uid_index, authors_index, page_properties)
+        for i, e in enumerate(updated_items, 1)
+    ]
+    
+    try:
+        for future in as_completed(futures):
+            action, uid, record = future.result()
             
-            # Immediately process PDF content for this entry
-            print(f"   📄 Adding PDF content...")
-            from src.link_paperpile_notion import add_pdf_content_for_entry
-            try:
-                add_pdf_content_for_entry(notion_token, notion_db, service, e)
-                print(f"   ✅ PDF content processing completed")
-            except Exception as pdf_error:
-                print(f"   ⚠️  PDF processing failed: {pdf_error}")
-        
-        # Update state immediately after processing each entry
-        curr_state[e["uid"]] = {"snapshot": tracked_snapshot(e)}
-        
-        # Save only this entry's update to preserve existing state
-        updated_state = load_state()  # Load current state from disk
-        updated_state[e["uid"]] = {"snapshot": tracked_snapshot(e)}  # Update this entry
-        save_state(updated_state)  # Save back
-        print(f"   💾 Updated state for: {e['uid']}")
-
-    print(f"\n📊 [SUMMARY] Processing complete!")
-    print(f"   ✅ Created: {created} pages")
-    print(f"   🔄 Updated: {modified} pages")
-    print(f"   📄 Total processed: {created + modified}")
-
-    print(f"\n[done] ✅ All processing completed successfully!")
+            if action == 'created':
+                created += 1
+            else:
+                modified += 1
+            
+            # Record progress in memory; checkpoint to disk periodically
+            curr_state[uid] = record
+            if (created + modified) % STATE_CHECKPOINT_EVERY == 0:
+                save_state(state)
+    except BaseException:
+        # A failure, Ctrl-C or SIGTERM: drop queued entries instead of running them all
+        _stop_and_record(executor, futures, curr_state)
+        save_state(state)
+        raise
+    executor.shutdown()
+
+    # Remember the synced bib so an unchanged export can skip parsing next time
+    if not (limit_mode and len(valid_entries) > limit_count):
+        state["bib"]["synced_hash"] = bib_hash
+    save_state(state)
+    atexit.unregister(save_state)
+
+    log.info("\n📊 [SUMMARY] Processing complete!")
+    log.info("   ✅ Created: %s pages", created)
+    log.info("   🔄 Updated: %s pages", modified)
+    log.info("   📄 Total processed: %s", created + modified)
+    stats = notion_stats()
+    log.info("   ⏭️  Unchanged (no update sent): %s pages", stats.get("updates_unchanged", 0) + stats.get("updates_duplicate", 0))
+    log.info("   📎 PDF fields: %s updated, %s already current",
+             stats.get("pdf_fields_updated", 0), stats.get("pdf_fields_skipped", 0))
+    if stats.get("rate_limited"):
+        log.info("   🚦 Rate-limited responses retried: %s", stats["rate_limited"])
+
+    log.info("\n[done] ✅ All processing completed successfully!")
 
 if __name__ == "__main__":
     main()
@@ -5,8 +5,11 @@ A comprehensive tool to sync academic papers from Paperpile to Notion with full
 """
 from .core import notion_create_page_with_pdf, add_pdf_content_to_notion_page, add_pdf_content_for_entry
 from .notion_client import (
-    notion_create_page, notion_update_page, notion_query_by_uid,
-    notion_get_property, notion_update_pdf_fields, notion_add_blocks
+    notion_create_page, notion_update_page, notion_query_by_uid, notion_query_by_uids,
+    notion_load_authors_index, prime_author_cache, resolve_authors, notion_get_page_properties,
+    notion_get_property, notion_property_value,
+    notion_update_pdf_fields, notion_upsert_pdf_fields, notion_add_blocks,
+    notion_stats, build_http_session, SESSION, NotionRateLimiter, NotionPageGone
 )
 from .drive_client import (
     build_drive_service, drive_find_pdf, drive_find_pdf_with_content,
@@ -16,6 +19,5 @@ from .notion_blocks import (
     create_pdf_embed_block, create_divider_block, create_heading_block,
     create_paragraph_block, markdown_to_notion_blocks
 )
-from .cleanup import clean_temporary_files
 
 __version__ = "0.1.0"
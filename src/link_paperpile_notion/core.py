@@ -1,56 +1,62 @@
 """
 Core integration functions for unified PDF processing and Notion page creation.
 """
-import time
-from typing import Dict, Optional
+import logging
+from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 from .notion_client import (
-    notion_create_page, notion_update_pdf_fields, notion_add_blocks
+    notion_create_page, notion_upsert_pdf_fields, notion_property_value, notion_add_blocks
 )
 from .drive_client import drive_find_pdf_with_content
 from .notion_blocks import (
     create_pdf_embed_block, create_divider_block, 
     create_heading_block, markdown_to_notion_blocks
 )
-from .cleanup import clean_temporary_files
 
-def notion_create_page_with_pdf(token: str, dbid: str, entry: Dict, authors_db: Optional[str], service) -> str:
+log = logging.getLogger(__name__)
+
+# Page creation runs beside the caller's Drive/PDF work. Notion calls are
+# thread-safe (shared session + limiter); the Drive service stays on the caller.
+_PAGE_CREATE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notion-create")
+
+def notion_create_page_with_pdf(token: str, dbid: str, entry: Dict, authors_db: Optional[str], service,
+                                authors_index: Optional[Dict[str, str]] = None) -> str:
     """
     Create a Notion page with integrated PDF processing.
     This combines page creation, PDF search, content extraction, and embedding in one operation.
     """
-    print(f"🔍 [CREATE+PDF] Creating page with integrated PDF processing...")
-    print(f"   📄 Title: {entry.get('title', 'Unknown')[:60]}...")
+    log.info("🔍 [CREATE+PDF] Creating page with integrated PDF processing...")
+    log.info("   📄 Title: %s...", entry.get('title', 'Unknown')[:60])
     
-    # Step 1: Create the basic Notion page
-    page_id = notion_create_page(token, dbid, entry, authors_db)
+    # Step 1: Create the basic Notion page on a helper thread so the
+    # network round trips overlap with the Drive search and PDF extraction
+    page_future = _PAGE_CREATE_POOL.submit(notion_create_page, token, dbid, entry, authors_db, authors_index)
     
     # Step 2: Search for PDF and extract content
+    file_meta = None
     if service is not None:
-        print(f"🔍 [CREATE+PDF] Searching for PDF during page creation...")
+        log.info("🔍 [CREATE+PDF] Searching for PDF during page creation...")
         file_meta = drive_find_pdf_with_content(service, entry)
-        
+    
+    page_id = page_future.result()
+    
+    if service is not None:
         if file_meta:
             try:
                 # Step 3: Update PDF fields in Notion
-                notion_update_pdf_fields(token, page_id, file_meta["id"], file_meta.get("webViewLink", ""))
-                print(f"✅ [CREATE+PDF] Updated PDF fields in Notion")
+                notion_upsert_pdf_fields(token, page_id, file_meta["id"], file_meta.get("webViewLink", ""))
+                log.info("✅ [CREATE+PDF] Updated PDF fields in Notion")
                 
                 # Step 4: Add PDF content to the page
                 add_pdf_content_to_notion_page(token, page_id, file_meta)
-                print(f"✅ [CREATE+PDF] Added PDF content to page")
-                
-                # Step 5: Clean up temporary files
-                clean_temporary_files(file_meta)
+                log.info("✅ [CREATE+PDF] Added PDF content to page")
                 
             except Exception as e:
-                print(f"❌ [CREATE+PDF] Error during PDF processing: {e}")
-                # Still clean up files even if there was an error
-                if file_meta:
-                    clean_temporary_files(file_meta)
+                log.error("❌ [CREATE+PDF] Error during PDF processing: %s", e)
         else:
-            print(f"❌ [CREATE+PDF] No PDF found for this entry")
+            log.warning("❌ [CREATE+PDF] No PDF found for this entry")
     else:
-        print(f"⚠️  [CREATE+PDF] Google Drive service not available")
+        log.warning("⚠️  [CREATE+PDF] Google Drive service not available")
     
     return page_id
 
@@ -63,7 +69,7 @@ def add_pdf_content_to_notion_page(token: str, page_id: str, file_meta: Dict) ->
     if web_view_link:
         blocks.append(create_pdf_embed_block(web_view_link))
         blocks.append(create_divider_block())
-        print(f"[content] Added PDF embed block")
+        log.info("[content] Added PDF embed block")
     
     # 2. Add extracted text content if available
     markdown_content = file_meta.get("markdown_content")
@@ -74,9 +80,9 @@ def add_pdf_content_to_notion_page(token: str, page_id: str, file_meta: Dict) ->
         # Convert markdown to Notion blocks
         markdown_blocks = markdown_to_notion_blocks(markdown_content)
         blocks.extend(markdown_blocks)
-        print(f"[content] Converted {len(markdown_blocks)} blocks from markdown content")
+        log.info("[content] Converted %s blocks from markdown content", len(markdown_blocks))
     else:
-        print(f"[content] No markdown content available to add")
+        log.info("[content] No markdown content available to add")
     
     # 3. Add summary information if available
     if file_meta.get('text_summary'):
@@ -94,35 +100,33 @@ def add_pdf_content_to_notion_page(token: str, page_id: str, file_meta: Dict) ->
         
         summary_blocks = markdown_to_notion_blocks(summary_text)
         blocks.extend(summary_blocks)
-        print(f"[content] Added document summary")
+        log.info("[content] Added document summary")
     
-    # 4. Add all blocks to the page (in batches if needed)
+    # 4. Add all blocks to the page (notion_add_blocks batches them in order)
     if blocks:
-        # Notion API allows up to 100 blocks per request
-        batch_size = 100
-        for i in range(0, len(blocks), batch_size):
-            batch = blocks[i:i + batch_size]
-            notion_add_blocks(token, page_id, batch)
-            if len(blocks) > batch_size:
-                print(f"[content] Added blocks {i+1}-{min(i+batch_size, len(blocks))} of {len(blocks)}")
-                time.sleep(0.5)  # Rate limiting
-        
-        print(f"✅ [content] Successfully added {len(blocks)} blocks to Notion page")
+        notion_add_blocks(token, page_id, blocks)
+        log.info("✅ [content] Successfully added %s blocks to Notion page", len(blocks))
     else:
-        print(f"[content] No blocks to add to Notion page")
+        log.info("[content] No blocks to add to Notion page")
 
 
-def add_pdf_content_for_entry(token: str, dbid: str, service, entry: Dict) -> None:
-    """Add PDF content for a specific entry by UID."""
+def add_pdf_content_for_entry(token: str, dbid: str, service, entry: Dict, page_id: Optional[str] = None,
+                              page_properties: Optional[Dict[str, Any]] = None) -> None:
+    """Add PDF content for a specific entry by UID (skips the lookup if page_id is known).
+    
+    ``page_properties`` are the page's prefetched properties; with them the
+    PDF fields are only patched when the Drive file actually changed.
+    """
     from .notion_client import notion_query_by_uid
     
     # Find the Notion page for this entry
-    page_id = notion_query_by_uid(token, dbid, entry["uid"])
+    if page_id is None:
+        page_id = notion_query_by_uid(token, dbid, entry["uid"])
     if not page_id:
-        print(f"❌ [PDF-ENTRY] Page not found for UID: {entry['uid']}")
+        log.error("❌ [PDF-ENTRY] Page not found for UID: %s", entry['uid'])
         return
     
-    print(f"🔍 [PDF-ENTRY] Processing PDF for: {entry.get('title', 'Unknown')[:60]}...")
+    log.info("🔍 [PDF-ENTRY] Processing PDF for: %s...", entry.get('title', 'Unknown')[:60])
     
     # Search for PDF and extract content
     if service is not None:
@@ -131,23 +135,18 @@ def add_pdf_content_for_entry(token: str, dbid: str, service, entry: Dict) -> No
         if file_meta:
             try:
                 # Update PDF fields in Notion
-                from .notion_client import notion_update_pdf_fields
-                notion_update_pdf_fields(token, page_id, file_meta["id"], file_meta.get("webViewLink", ""))
-                print(f"✅ [PDF-ENTRY] Updated PDF fields")
+                current_drive_id = notion_property_value(page_properties, "Drive File ID") if page_properties else None
+                if notion_upsert_pdf_fields(token, page_id, file_meta["id"], file_meta.get("webViewLink", ""),
+                                            current_drive_id):
+                    log.info("✅ [PDF-ENTRY] Updated PDF fields")
                 
                 # Add PDF content to the page
                 add_pdf_content_to_notion_page(token, page_id, file_meta)
-                print(f"✅ [PDF-ENTRY] Added PDF content")
-                
-                # Clean up temporary files
-                clean_temporary_files(file_meta)
+                log.info("✅ [PDF-ENTRY] Added PDF content")
                 
             except Exception as e:
-                print(f"❌ [PDF-ENTRY] Error during PDF processing: {e}")
-                # Still clean up files even if there was an error
-                if file_meta:
-                    clean_temporary_files(file_meta)
+                log.error("❌ [PDF-ENTRY] Error during PDF processing: %s", e)
         else:
-            print(f"❌ [PDF-ENTRY] No PDF found for this entry")
+            log.warning("❌ [PDF-ENTRY] No PDF found for this entry")
     else:
-        print(f"⚠️  [PDF-ENTRY] Google Drive service not available")
+        log.warning("⚠️  [PDF-ENTRY] Google Drive service not available")
@@ -4,20 +4,87 @@ Google Drive client functions for PDF search and content extraction.
 import os
 import re
 import json
+import gzip
+import atexit
+import logging
+import threading
+import multiprocessing
+import tempfile
 import fitz  # PyMuPDF
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload
 
+log = logging.getLogger(__name__)
+
+# Regexes used per title/line/span during search and PDF text formatting
+_WS = re.compile(r'\s+')
+_SENT_END = re.compile(r'[.!?;:]\s*$')
+_EQ_NUMBER = re.compile(r'\([0-9]+\)$')
+
+# Title normalization: punctuation/symbols become spaces via str.translate
+class _PunctToSpace(dict):
+    """str.translate table mapping every char outside [\\w\\s-] to a space.
+    
+    Entries are computed on first sight and memoized, so it covers all of
+    Unicode without a prebuilt 1.1M-entry table.
+    """
+    def __missing__(self, c: int):
+        ch = chr(c)
+        value = c if ch.isalnum() or ch.isspace() or ch in "_-" else " "
+        self[c] = value
+        return value
+
+_PUNCT_TABLE = _PunctToSpace()
+
+# Line classifiers, written as position-0 patterns so they can be fused below.
+# Lookaheads scan lazily (.*?) so a hit stops at the first occurrence.
+# Citation/footer material (checked first): session banners, venue lines with a
+# year, permission statements, DOI/ISBN/ISSN lines. Bare page numbers are
+# caught by _is_page_number before any regex runs.
+_CITE_SRC = (
+    r'(?i:(?=.*?session)(?=.*?(?:brain|taste))'
+    r'|(?=.*?\d{4})(?=.*?(?:uist|acm|ieee))'
+    r'|(?=.*?permission)(?=.*?(?:make digital|copyright))'
+    r'|(?=.*?(?:doi|isbn|issn).*?:))'
+)
+# Figure/table/equation captions
+_FIG_SRC = r'(?i:figure |fig\.|table |equation |(?:figure|fig\.?|table|equation)\s+\d)'
+# Mathematical operators, Greek letters, equation patterns, sub/superscripts,
+# logarithms and trailing equation numbers (case-sensitive)
+_MATH_SRC = (
+    r'(?=.*?(?:[=<>≤≥≠±∞∑∏∫]|[α-ωΑ-Ω]|\^?\d+\s*=\s*|[a-zA-Z]_[a-zA-Z0-9]+'
+    r'|[a-zA-Z]\^[a-zA-Z0-9]+|log\s+[a-zA-Z]|\([0-9]+\)$))'
+)
+_CITE = re.compile(_CITE_SRC, re.S)
+_FIG = re.compile(_FIG_SRC, re.S)
+_MATH = re.compile(_MATH_SRC, re.S)
+# One pass per line; alternation order gives cite > fig > math priority
+_CLASSIFY = re.compile(f'(?P<cite>{_CITE_SRC})|(?P<fig>{_FIG_SRC})|(?P<math>{_MATH_SRC})', re.S)
+
+# PDF extraction settings, read once at import rather than per page
+_INCLUDE_PAGE_NUMBERS = os.environ.get("PDF_INCLUDE_PAGE_NUMBERS", "false").lower() in ("true", "1", "yes")
+try:
+    _PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "10"))
+except ValueError:
+    _PDF_MAX_PAGES = 10  # Default to 10 pages
+try:
+    _PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "1"))
+except ValueError:
+    _PDF_WORKERS = 1
+
 # Check for PyMuPDF availability
 try:
     import fitz
     _PYMUPDF_AVAILABLE = True
 except ImportError:
     _PYMUPDF_AVAILABLE = False
-    print("[warning] PyMuPDF not available - PDF content extraction disabled")
+    log.warning("[warning] PyMuPDF not available - PDF content extraction disabled")
 
 def build_drive_service():
     """Build Google Drive service client."""
@@ -25,13 +92,13 @@ def build_drive_service():
         from google.oauth2 import service_account
         from googleapiclient.discovery import build
     except ImportError:
-        print("[drive] Google Drive libraries not available")
+        log.warning("[drive] Google Drive libraries not available")
         return None
     
     cred_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
-    print(f"[drive] Checking credentials path: {cred_path}")
+    log.info("[drive] Checking credentials path: %s", cred_path)
     if not cred_path or not Path(cred_path).exists():
-        print("[drive] Google Drive credentials not found")
+        log.warning("[drive] Google Drive credentials not found")
         return None
     
     try:
@@ -39,10 +106,10 @@ def build_drive_service():
             cred_path, scopes=["https://www.googleapis.com/auth/drive.readonly"]
         )
         service = build("drive", "v3", credentials=credentials)
-        print("[drive] Successfully built Google Drive service")
+        log.info("[drive] Successfully built Google Drive service")
         return service
     except Exception as e:
-        print(f"[drive] Failed to build service: {e}")
+        log.error("[drive] Failed to build service: %s", e)
         return None
 
 def normalize_title(title: str) -> str:
@@ -50,8 +117,8 @@ def normalize_title(title: str) -> str:
     if not title:
         return ""
     # Remove common patterns and normalize
-    title = re.sub(r'[^\w\s-]', ' ', title)
-    title = re.sub(r'\s+', ' ', title).strip()
+    title = title.translate(_PUNCT_TABLE)
+    title = _WS.sub(' ', title).strip()
     return title
 
 def expected_pdf_name(entry: Dict) -> str:
@@ -84,22 +151,25 @@ def generate_pdf_search_patterns(entry: Dict) -> List[str]:
         return patterns
     
     first_last = authors[0]["last"]
+    # Very short surnames ("Li", "Wu") match thousands of unrelated files
+    use_author = len(first_last) >= 3
     
     # Pattern 1: Author Year Title (truncated)
-    if title and len(title) > 10:
+    if use_author and title and len(title) > 10:
         title_short = title.split()[0:6]  # First 6 words
         title_part = " ".join(title_short)
         patterns.append(f"{first_last} {year} {title_part} .pdf")
     
     # Pattern 2: Author Year - Full title
-    if title:
+    if use_author and title:
         patterns.append(f"{first_last} {year} - {title}.pdf")
     
     # Pattern 3: Just Author Year
-    patterns.append(f"{first_last} {year}.pdf")
+    if use_author:
+        patterns.append(f"{first_last} {year}.pdf")
     
     # Pattern 4: Multiple authors
-    if len(authors) > 1:
+    if use_author and len(authors) > 1:
         patterns.append(f"{first_last} et al {year}.pdf")
         patterns.append(f"{first_last} et al. {year}.pdf")
     
@@ -107,7 +177,35 @@ def generate_pdf_search_patterns(entry: Dict) -> List[str]:
     if title and len(title) > 15:
         patterns.append(f"{title}.pdf")
     
-    return patterns
+    return _dedupe_patterns(patterns)
+
+def _pattern_key(text: str) -> str:
+    """Normalized form of a search pattern or file name for comparisons."""
+    return _WS.sub(' ', text.lower().replace('.', '')).strip()
+
+def _dedupe_patterns(patterns: List[str]) -> List[str]:
+    """Drop patterns that are the same Drive search, keeping the first of each.
+    
+    Drive name matching is case-insensitive and loose on punctuation, so patterns
+    differing only in case, spacing or dots return the same files.
+    """
+    seen = set()
+    unique = []
+    for pattern in patterns:
+        key = _pattern_key(pattern)
+        if key not in seen:
+            seen.add(key)
+            unique.append(pattern)
+    return unique
+
+def _search_files(service, q: str, page_size: int, page_token: Optional[str] = None) -> Dict:
+    """Run one page of a Drive files.list query for PDFs."""
+    return service.files().list(
+        q=q,
+        fields="nextPageToken, files(id,name,size,webViewLink,modifiedTime)",
+        pageSize=page_size,
+        pageToken=page_token
+    ).execute()
 
 def drive_search_by_pattern(service, pattern: str) -> Optional[Dict]:
     """Search Google Drive for PDF by filename pattern."""
@@ -116,21 +214,176 @@ def drive_search_by_pattern(service, pattern: str) -> Optional[Dict]:
         search_pattern = pattern.replace("'", "\\'")
         q = f"name contains '{search_pattern}' and mimeType='application/pdf' and trashed=false"
         
-        resp = service.files().list(
-            q=q,
-            fields="files(id,name,size,webViewLink,modifiedTime)",
-            pageSize=10
-        ).execute()
-        
-        files = resp.get("files", [])
+        files = _search_files(service, q, 10).get("files", [])
         if files:
             # Return the first match (most relevant)
             return files[0]
     except Exception as e:
-        print(f"[drive] Search error for pattern '{pattern}': {e}")
+        log.error("[drive] Search error for pattern '%s': %s", pattern, e)
     
     return None
 
+# An OR query can match many files through its loosest clause; page through
+# results (bounded) so a specific match is not cut off by the first page
+_SEARCH_PAGE_SIZE = 50
+_SEARCH_MAX_PAGES = 4
+
+def drive_search_any(service, patterns: List[str]) -> List[Dict]:
+    """Search Google Drive for PDFs matching any of the patterns in a single query.
+    
+    Further result pages are fetched until a file matches the first (most
+    specific) pattern or ``_SEARCH_MAX_PAGES`` pages have been read.
+    """
+    if not patterns:
+        return []
+    files = []
+    try:
+        # Escape special characters for Drive search
+        clauses = " or ".join(
+            "name contains '{}'".format(p.replace("'", "\\'")) for p in patterns
+        )
+        q = f"({clauses}) and mimeType='application/pdf' and trashed=false"
+        page_token = None
+        for _ in range(_SEARCH_MAX_PAGES):
+            resp = _search_files(service, q, _SEARCH_PAGE_SIZE, page_token)
+            page = resp.get("files", [])
+            files.extend(page)
+            page_token = resp.get("nextPageToken")
+            if not page_token or any(_match_rank(f.get('name', ''), patterns) == 0 for f in page):
+                break
+    except Exception as e:
+        log.error("[drive] Search error for patterns %s: %s", patterns, e)
+    
+    return files
+
+def _match_rank(name: str, patterns: List[str]) -> int:
+    """Index of the first (most specific) pattern found in a file name; len(patterns) if none."""
+    name = _pattern_key(name)
+    for rank, pattern in enumerate(patterns):
+        if _pattern_key(pattern) in name:
+            return rank
+    return len(patterns)
+
+# On-disk cache reused across syncs: entry key -> Drive file metadata, and
+# file id -> extracted content (invalidated when the Drive modifiedTime changes)
+_DRIVE_FIELDS = ("id", "name", "size", "webViewLink", "modifiedTime")
+_DRIVE_INDEX: Optional[Dict[str, Dict]] = None
+_DRIVE_INDEX_DIRTY = False
+_CACHE_LOCK = threading.Lock()
+
+def _cache_dir() -> Optional[Path]:
+    """Cache directory, or None when PDF_CACHE=false."""
+    if os.environ.get("PDF_CACHE", "true").lower() not in ("true", "1", "yes"):
+        return None
+    return Path(os.environ.get("PDF_CACHE_DIR") or Path.home() / ".cache" / "link_paperpile_notion").expanduser()
+
+def _drive_index_key(entry: Dict) -> str:
+    """Cache key for an entry's Drive lookup."""
+    authors = entry.get("authors", [])
+    first_last = authors[0]["last"] if authors else ""
+    year = str(entry.get("year", "")).strip()
+    return f"{first_last}|{year}|{normalize_title(entry.get('title', ''))[:64]}"
+
+def _drive_index(cache_dir: Path) -> Dict[str, Dict]:
+    """Load the Drive lookup index once; it is written back at exit."""
+    global _DRIVE_INDEX
+    with _CACHE_LOCK:
+        if _DRIVE_INDEX is None:
+            try:
+                _DRIVE_INDEX = json.loads((cache_dir / "drive_index.json").read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                _DRIVE_INDEX = {}
+            except Exception as e:
+                log.warning("[cache] Ignoring unreadable Drive index: %s", e)
+                _DRIVE_INDEX = {}
+            atexit.register(_save_drive_index, cache_dir)
+        return _DRIVE_INDEX
+
+def _save_drive_index(cache_dir: Path) -> None:
+    """Atomically write the Drive lookup index if it changed."""
+    global _DRIVE_INDEX_DIRTY
+    with _CACHE_LOCK:
+        if not _DRIVE_INDEX_DIRTY:
+            return
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_dir / "drive_index.json.tmp"
+            tmp_path.write_text(json.dumps(_DRIVE_INDEX), encoding="utf-8")
+            os.replace(tmp_path, cache_dir / "drive_index.json")
+            _DRIVE_INDEX_DIRTY = False
+        except Exception as e:
+            log.warning("[cache] Failed to write Drive index: %s", e)
+
+def _remember_drive_match(cache_dir: Path, key: str, file_meta: Dict) -> None:
+    """Record a Drive match for an entry key."""
+    global _DRIVE_INDEX_DIRTY
+    index = _drive_index(cache_dir)
+    with _CACHE_LOCK:
+        index[key] = {k: file_meta[k] for k in _DRIVE_FIELDS if k in file_meta}
+        _DRIVE_INDEX_DIRTY = True
+
+def _forget_drive_match(cache_dir: Path, key: str) -> None:
+    """Drop an entry key's recorded Drive match."""
+    global _DRIVE_INDEX_DIRTY
+    index = _drive_index(cache_dir)
+    with _CACHE_LOCK:
+        if index.pop(key, None) is not None:
+            _DRIVE_INDEX_DIRTY = True
+
+def _revalidate_drive_match(service, cached: Dict) -> Optional[Dict]:
+    """Fetch a cached match's live metadata; None if it was trashed or deleted.
+    
+    The live modifiedTime is what the extraction cache is checked against, so
+    a PDF replaced in Drive is extracted again.
+    """
+    try:
+        live = service.files().get(
+            fileId=cached["id"],
+            fields="id,name,size,webViewLink,modifiedTime,trashed"
+        ).execute()
+    except HttpError as e:
+        if e.resp.status == 404:
+            return None
+        raise
+    if live.get("trashed"):
+        return None
+    return {k: live[k] for k in _DRIVE_FIELDS if k in live}
+
+def _extraction_options() -> Dict:
+    """Settings that change extracted content; a cached extraction must match them."""
+    return {
+        "max_pages": _PDF_MAX_PAGES,
+        "page_numbers": _INCLUDE_PAGE_NUMBERS,
+    }
+
+def _load_cached_extraction(cache_dir: Path, file_meta: Dict) -> Optional[Dict]:
+    """Return cached extraction data for an unchanged Drive file, else None."""
+    path = cache_dir / "pdf_text" / f"{file_meta['id']}.json.gz"
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            record = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning("[cache] Ignoring unreadable extraction cache %s: %s", path.name, e)
+        return None
+    if record.get("modifiedTime") != file_meta.get("modifiedTime") or record.get("options") != _extraction_options():
+        return None
+    return record.get("data")
+
+def _store_cached_extraction(cache_dir: Path, file_meta: Dict, pdf_data: Dict) -> None:
+    """Persist extraction data keyed by file id and modifiedTime."""
+    path = cache_dir / "pdf_text" / f"{file_meta['id']}.json.gz"
+    record = {"modifiedTime": file_meta.get("modifiedTime"), "options": _extraction_options(), "data": pdf_data}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        log.warning("[cache] Failed to write extraction cache: %s", e)
+
 def drive_find_pdf(service, entry: Dict) -> Optional[Dict]:
     """Find PDF file in Google Drive for a given entry."""
     if service is None:
@@ -142,63 +395,224 @@ def drive_find_pdf(service, entry: Dict) -> Optional[Dict]:
     first_last = authors[0]["last"] if authors else ""
     
     # Show what we're searching for
-    print(f"🔍 [PDF SEARCH] Looking for: {entry.get('title', 'Unknown Title')}")
-    print(f"   👤 Author: {first_last} {('et al.' if len(authors) > 1 else '')}")
-    print(f"   📅 Year: {year}")
-    print(f"   🎯 Primary pattern: {expected_pdf_name(entry)}")
-    
-    # Strategy 1: Try exact filename matches
-    patterns = generate_pdf_search_patterns(entry)
-    for pattern in patterns:
-        file_meta = drive_search_by_pattern(service, pattern.replace('.pdf', ''))
-        if file_meta:
-            print(f"✅ [PDF FOUND] Using pattern: {pattern}")
-            print(f"   📄 File: {file_meta['name']}")
-            print(f"   📦 Size: {int(file_meta.get('size', 0)) / 1_000_000:.1f} MB")
-            return file_meta
-    
-    # Strategy 2: Search by components (author + year)
+    log.info("🔍 [PDF SEARCH] Looking for: %s", entry.get('title', 'Unknown Title'))
+    log.info("   👤 Author: %s %s", first_last, 'et al.' if len(authors) > 1 else '')
+    log.info("   📅 Year: %s", year)
+    log.info("   🎯 Primary pattern: %s", expected_pdf_name(entry))
+    
+    cache_dir = _cache_dir()
+    cache_key = _drive_index_key(entry)
+    if cache_dir is not None:
+        cached = _drive_index(cache_dir).get(cache_key)
+        if cached:
+            try:
+                file_meta = _revalidate_drive_match(service, cached)
+            except Exception as e:
+                # Keep the entry; a transient error says nothing about the file
+                log.warning("[cache] Could not check cached Drive match, searching again: %s", e)
+            else:
+                if file_meta:
+                    log.info("✅ [PDF FOUND] Using cached match")
+                    log.info("   📄 File: %s", file_meta['name'])
+                    if file_meta != cached:
+                        _remember_drive_match(cache_dir, cache_key, file_meta)
+                    return file_meta
+                log.info("[cache] Cached Drive match was trashed or deleted; searching again")
+                _forget_drive_match(cache_dir, cache_key)
+    
+    # Strategy 1: exact filename patterns, most specific first
+    specific = _dedupe_patterns([p.replace('.pdf', '') for p in generate_pdf_search_patterns(entry)])
+    
+    # Strategy 2: components (author + year)
+    fallback = []
     search_terms = []
     if first_last and len(first_last) > 2:
         search_terms.append(first_last)
     if year and year != "None":
         search_terms.append(year)
-    
     if search_terms:
-        combined_search = " ".join(search_terms)
-        file_meta = drive_search_by_pattern(service, combined_search)
-        if file_meta:
-            print(f"✅ [PDF FOUND] Using components: {combined_search}")
-            print(f"   📄 File: {file_meta['name']}")
-            return file_meta
-    
-    # Strategy 3: Try title-only search as last resort
+        fallback.append(" ".join(search_terms))
+    
+    # Strategy 3: title-only search as last resort
     if title and len(title) > 10:
-        title_words = title.split()[:4]  # First 4 words
-        title_search = " ".join(title_words)
-        file_meta = drive_search_by_pattern(service, title_search)
-        if file_meta:
-            print(f"✅ [PDF FOUND] Using title: {title_search}")
-            print(f"   📄 File: {file_meta['name']}")
-            return file_meta
+        fallback.append(" ".join(title.split()[:4]))  # First 4 words
+    
+    # One OR query per tier instead of a round-trip per strategy; the broad
+    # fallbacks only run when nothing specific matched, so they cannot crowd
+    # out an exact match. Hits are ranked locally by the earliest pattern they
+    # contain, keeping Drive's order for ties
+    patterns = _dedupe_patterns(specific + fallback)
+    files = drive_search_any(service, specific)
+    if not files:
+        files = drive_search_any(service, patterns[len(specific):])
+    if files:
+        ranks = [_match_rank(f.get('name', ''), patterns) for f in files]
+        best = min(range(len(files)), key=ranks.__getitem__)
+        file_meta = files[best]
+        matched = patterns[ranks[best]] if ranks[best] < len(patterns) else "(drive match)"
+        log.info("✅ [PDF FOUND] Using pattern: %s", matched)
+        log.info("   📄 File: %s", file_meta['name'])
+        log.info("   📦 Size: %.1f MB", int(file_meta.get('size', 0)) / 1_000_000)
+        if cache_dir is not None:
+            _remember_drive_match(cache_dir, cache_key, file_meta)
+        return file_meta
     
     # No PDF found
-    print(f"❌ [PDF NOT FOUND] No matching PDF found in Google Drive")
+    log.warning("❌ [PDF NOT FOUND] No matching PDF found in Google Drive")
     return None
 
-def extract_pdf_metadata_and_content(service, file_id: str, filename: str = "") -> Optional[Dict]:
+# Drive media download chunk size for PDF content
+_DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+# Image-only detection: pages probed and the text length below which a page counts as empty
+_IMAGE_ONLY_PROBE_PAGES = 2
+_IMAGE_ONLY_MIN_CHARS = 40
+# PDFs larger than this are spooled to a temp file that MuPDF reads from disk
+_SPOOL_TO_DISK_BYTES = 50 * 1_000_000
+
+# MuPDF objects are not thread-safe and hold the GIL, so multi-page extraction
+# fans out to worker processes, each opening its own copy of the document.
+# Workers are spawned, not forked: by then the sync runs several threads, and a
+# forked child can inherit a logging or urllib3 lock held by one of them
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+def _pdf_pool(workers: int) -> ProcessPoolExecutor:
+    """Lazily create the shared PDF extraction process pool."""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _PDF_POOL
+
+def _dict_plain_text(text_dict: Dict) -> str:
+    """Rebuild get_text("text") output (one line per text line) from a text dict."""
+    return "".join(
+        "".join(span.get("text", "") for span in line.get("spans", [])) + "\n"
+        for block in text_dict.get("blocks", []) if block.get("type") == 0
+        for line in block.get("lines", [])
+    )
+
+def _extract_page(page, page_num: int) -> Tuple[str, str]:
+    """Extract (markdown, plain text) from a single PDF page."""
+    markdown_content = ""
+    text_dict = None
+    # Use structured text extraction with font information for better quality
+    try:
+        text_dict = page.get_text("dict")
+        structured_md = format_structured_text(text_dict, page_num)
+        if structured_md.strip():
+            markdown_content += structured_md
+    except:
+        # Fallback to simple markdown conversion
+        try:
+            page_md = page.get_text("markdown")
+            if page_md.strip():
+                if _INCLUDE_PAGE_NUMBERS:
+                    markdown_content += f"\n\n## Page {page_num}\n\n{page_md.strip()}"
+                else:
+                    markdown_content += f"\n\n{page_md.strip()}"
+        except:
+            # Final fallback to plain text
+            page_text = page.get_text("text")
+            if page_text.strip():
+                if _INCLUDE_PAGE_NUMBERS:
+                    markdown_content += f"\n\n## Page {page_num}\n\n{page_text.strip()}"
+                else:
+                    markdown_content += f"\n\n{page_text.strip()}"
+    
+    # Plain text for the summary comes from the dict when we have it (one MuPDF pass)
+    page_text = _dict_plain_text(text_dict) if text_dict is not None else page.get_text("text")
+    return markdown_content, page_text
+
+def _open_pdf(source):
+    """Open a PDF from in-memory bytes or a temp file path."""
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+def _extract_page_range(source, start: int, stop: int) -> List[Tuple[str, str]]:
+    """Process-pool worker: open the PDF and extract pages [start, stop)."""
+    doc = _open_pdf(source)
+    try:
+        return [_extract_page(doc.load_page(n), n + 1) for n in range(start, stop)]
+    finally:
+        doc.close()
+        fitz.TOOLS.store_shrink(100)
+
+def _extract_pages(doc, source, max_pages: int) -> List[Tuple[str, str]]:
+    """Extract the first max_pages pages in order, in parallel when PDF_WORKERS > 1."""
+    workers = _PDF_WORKERS
+    if workers <= 1 or max_pages <= 1:
+        return [_extract_page(doc.load_page(n), n + 1) for n in range(max_pages)]
+    
+    # Hand workers a file path so an in-memory PDF is not pickled into every task
+    tmp_path = None
+    if not isinstance(source, str):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tf:
+            tf.write(source)
+        source = tmp_path = tf.name
+    try:
+        # Contiguous page segments, one task per worker; results come back in page order
+        pool = _pdf_pool(workers)
+        step = -(-max_pages // min(workers, max_pages))
+        futures = [pool.submit(_extract_page_range, source, start, min(start + step, max_pages))
+                   for start in range(0, max_pages, step)]
+        return [page for fut in futures for page in fut.result()]
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+
+def _looks_image_only(doc, max_pages: int) -> bool:
+    """True when the first (up to two) pages carry under 40 characters of text each."""
+    for n in range(min(_IMAGE_ONLY_PROBE_PAGES, max_pages)):
+        if len(doc.load_page(n).get_text("text").strip()) >= _IMAGE_ONLY_MIN_CHARS:
+            return False
+    return True
+
+def _download_into(fh, request) -> None:
+    """Stream a Drive media request into a file object in chunks."""
+    downloader = MediaIoBaseDownload(fh, request, chunksize=_DOWNLOAD_CHUNK_SIZE)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+
+def _download_pdf(service, file_id: str, size_hint: int = 0) -> Tuple[Any, int]:
+    """Download a Drive PDF; returns (bytes or temp file path, size in bytes)."""
+    request = service.files().get_media(fileId=file_id)
+    if size_hint > _SPOOL_TO_DISK_BYTES:
+        # Large (usually scanned) PDFs go to disk so the body never sits in RAM
+        tf = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+        try:
+            with tf:
+                _download_into(tf, request)
+                return tf.name, tf.tell()
+        except BaseException:
+            os.unlink(tf.name)
+            raise
+    
+    # Small PDFs: one in-memory buffer, released once its bytes are taken
+    buf = BytesIO()
+    _download_into(buf, request)
+    file_size = buf.tell()
+    file_content = buf.getvalue()
+    buf.close()
+    return file_content, file_size
+
+def extract_pdf_metadata_and_content(service, file_id: str, filename: str = "",
+                                     size_bytes: int = 0) -> Optional[Dict]:
     """Download PDF from Google Drive and extract metadata + content using PyMuPDF."""
     if not _PYMUPDF_AVAILABLE:
-        print(f"[pdf] PyMuPDF not available - skipping content extraction")
+        log.warning("[pdf] PyMuPDF not available - skipping content extraction")
         return None
     
+    source = None
     try:
-        print(f"[pdf] Downloading PDF for content extraction...")
-        # Download PDF content
-        file_content = service.files().get_media(fileId=file_id).execute()
+        log.info("[pdf] Downloading PDF for content extraction...")
+        source, file_size = _download_pdf(service, file_id, size_bytes)
         
         # Open with PyMuPDF
-        doc = fitz.open(stream=file_content, filetype="pdf")
+        doc = _open_pdf(source)
         
         # Extract metadata
         pdf_metadata = doc.metadata
@@ -209,61 +623,46 @@ def extract_pdf_metadata_and_content(service, file_id: str, filename: str = "")
             'subject': pdf_metadata.get('subject', '').strip(),
         }
         
-        print(f"[pdf] PDF has {metadata['page_count']} pages")
+        log.info("[pdf] PDF has %s pages", metadata['page_count'])
         
         # Extract content as markdown using structured extraction (configurable page limit)
-        max_pages_env = os.environ.get("PDF_MAX_PAGES", "10")
-        try:
-            max_pages_limit = int(max_pages_env)
-        except:
-            max_pages_limit = 10  # Default to 10 pages
+        max_pages_limit = _PDF_MAX_PAGES
         max_pages = min(max_pages_limit, len(doc))
-        print(f"[pdf] Extracting content from first {max_pages} pages (limit: {max_pages_limit})")
-        markdown_content = ""
-        text_content = ""
+        extraction_method = 'structured_text_dict'
+        md_parts = []
+        text_parts = []
         
-        for page_num in range(max_pages):
-            page = doc.load_page(page_num)
-            
-            # Use structured text extraction with font information for better quality
-            try:
-                text_dict = page.get_text("dict")
-                structured_md = format_structured_text(text_dict, page_num + 1)
-                if structured_md.strip():
-                    markdown_content += structured_md
-            except:
-                # Fallback to simple markdown conversion
-                include_page_numbers = os.environ.get("PDF_INCLUDE_PAGE_NUMBERS", "false").lower() in ("true", "1", "yes")
-                try:
-                    page_md = page.get_text("markdown")
-                    if page_md.strip():
-                        if include_page_numbers:
-                            markdown_content += f"\n\n## Page {page_num + 1}\n\n{page_md.strip()}"
-                        else:
-                            markdown_content += f"\n\n{page_md.strip()}"
-                except:
-                    # Final fallback to plain text
-                    page_text = page.get_text("text")
-                    if page_text.strip():
-                        if include_page_numbers:
-                            markdown_content += f"\n\n## Page {page_num + 1}\n\n{page_text.strip()}"
-                        else:
-                            markdown_content += f"\n\n{page_text.strip()}"
-            
-            # Also get plain text for summary
-            page_text = page.get_text("text")
-            if page_text.strip():
-                text_content += page_text + "\n"
+        # Scanned/image-only PDFs have (almost) no text layer; probe the first
+        # pages cheaply and skip structured extraction when they are empty
+        if max_pages and _looks_image_only(doc, max_pages):
+            log.info("[pdf] No text layer found - skipping content extraction (image-only PDF)")
+            extraction_method = 'image_only_skipped'
+            max_pages = 0
+        else:
+            log.info("[pdf] Extracting content from first %s pages (limit: %s)", max_pages, max_pages_limit)
+        
+        summary_len = 0
+        for page_md, page_text in _extract_pages(doc, source, max_pages):
+            md_parts.append(page_md)
+            # Only the first 500 chars feed the summary; stop once past them
+            if summary_len <= 500 and page_text.strip():
+                text_parts.append(page_text)
+                text_parts.append("\n")
+                summary_len = len(_WS.sub(' ', ''.join(text_parts)).strip())
+        markdown_content = ''.join(md_parts)
+        text_content = ''.join(text_parts)
         
         # Generate a summary (first 500 chars of text with better cleaning)
         summary = ""
         if text_content.strip():
-            # Clean up text for summary
-            clean_text = re.sub(r'\s+', ' ', text_content.strip())
+            # Clean up text for summary; collapsing a 2000-char prefix is enough
+            # unless it is almost all whitespace
+            clean_text = _WS.sub(' ', text_content[:2000].strip())
+            if len(clean_text) <= 500 and len(text_content) > 2000:
+                clean_text = _WS.sub(' ', text_content.strip())
             summary = clean_text[:500] + "..." if len(clean_text) > 500 else clean_text
         
         # File size info
-        file_size = len(file_content)
         size_mb = file_size / 1_000_000
         
         result = {
@@ -277,41 +676,58 @@ def extract_pdf_metadata_and_content(service, file_id: str, filename: str = "")
                 'pages_extracted': max_pages,
                 'total_pages': metadata['page_count'],
                 'content_length': len(markdown_content),
-                'extraction_method': 'structured_text_dict',
+                'extraction_method': extraction_method,
             }
         }
         
         doc.close()
+        # Drop our document and empty MuPDF's object store so RSS stays flat across a long sync
+        del doc
+        fitz.TOOLS.store_shrink(100)
         
-        print(f"[pdf] Extracted structured content from {max_pages}/{metadata['page_count']} pages")
-        print(f"[pdf] Content length: {len(markdown_content)} chars (structured extraction)")
-        print(f"[pdf] File size: {size_mb:.1f}MB")
+        log.info("[pdf] Extracted structured content from %s/%s pages", max_pages, metadata['page_count'])
+        log.info("[pdf] Content length: %s chars (structured extraction)", len(markdown_content))
+        log.info("[pdf] File size: %.1fMB", size_mb)
         
         return result
         
     except Exception as e:
-        print(f"[pdf] Error processing PDF: {e}")
+        log.error("[pdf] Error processing PDF: %s", e)
         return None
+    finally:
+        if isinstance(source, str):
+            try:
+                os.unlink(source)
+            except OSError:
+                pass
 
 def drive_find_pdf_with_content(service, entry: Dict) -> Optional[Dict]:
     """Enhanced version that finds PDF and extracts content/metadata."""
     file_meta = drive_find_pdf(service, entry)
     if file_meta and _PYMUPDF_AVAILABLE:
-        print(f"📥 [PDF PROCESSING] Extracting content from: {file_meta['name']}")
-        # Extract PDF content and metadata
-        pdf_data = extract_pdf_metadata_and_content(service, file_meta['id'], file_meta['name'])
+        log.info("📥 [PDF PROCESSING] Extracting content from: %s", file_meta['name'])
+        # Extract PDF content and metadata, reusing a previous run's extraction of the same revision
+        cache_dir = _cache_dir()
+        pdf_data = _load_cached_extraction(cache_dir, file_meta) if cache_dir is not None else None
+        if pdf_data:
+            log.info("[cache] Reusing extracted content for unchanged PDF")
+        else:
+            pdf_data = extract_pdf_metadata_and_content(service, file_meta['id'], file_meta['name'],
+                                                        int(file_meta.get('size', 0)))
+            if pdf_data and cache_dir is not None:
+                _store_cached_extraction(cache_dir, file_meta, pdf_data)
         if pdf_data:
             # Merge PDF data into file metadata
             file_meta.update(pdf_data)
             pages_extracted = pdf_data.get('extraction_info', {}).get('pages_extracted', 0)
             content_length = pdf_data.get('extraction_info', {}).get('content_length', 0)
-            print(f"✅ [PDF SUCCESS] Content extraction completed!")
-            print(f"   📄 Pages processed: {pages_extracted}")
-            print(f"   📝 Content length: {content_length:,} characters")
+            log.info("✅ [PDF SUCCESS] Content extraction completed!")
+            log.info("   📄 Pages processed: %s", pages_extracted)
+            log.info("   📝 Content length: %s characters", f"{content_length:,}")
         else:
-            print(f"❌ [PDF ERROR] Content extraction failed")
+            log.error("❌ [PDF ERROR] Content extraction failed")
     elif file_meta and not _PYMUPDF_AVAILABLE:
-        print(f"⚠️  [PDF WARNING] PyMuPDF not available - skipping content extraction")
+        log.warning("⚠️  [PDF WARNING] PyMuPDF not available - skipping content extraction")
     
     return file_meta
 
@@ -321,99 +737,94 @@ def clean_paragraph_text(text: str) -> str:
         return text
     
     # Remove excessive whitespace and normalize
-    text = re.sub(r'\s+', ' ', text.strip())
+    text = _WS.sub(' ', text.strip())
     
     # Don't break sentences unnecessarily - only break at proper sentence boundaries
     # Join lines that don't end with sentence-ending punctuation
     lines = text.split('\n')
     cleaned_lines = []
-    current_paragraph = ""
+    paragraph_parts = []
     
     for line in lines:
         line = line.strip()
         if not line:
-            if current_paragraph:
-                cleaned_lines.append(current_paragraph.strip())
-                current_paragraph = ""
+            if paragraph_parts:
+                cleaned_lines.append(" ".join(paragraph_parts).strip())
+                paragraph_parts = []
             continue
         
         # If the previous line doesn't end with sentence punctuation, join with current line
-        if current_paragraph and not re.search(r'[.!?;:]\s*$', current_paragraph):
-            current_paragraph += " " + line
+        if paragraph_parts and not _SENT_END.search(paragraph_parts[-1]):
+            paragraph_parts.append(line)
         else:
-            if current_paragraph:
-                cleaned_lines.append(current_paragraph.strip())
-            current_paragraph = line
+            if paragraph_parts:
+                cleaned_lines.append(" ".join(paragraph_parts).strip())
+            paragraph_parts = [line]
     
     # Don't forget the last paragraph
-    if current_paragraph:
-        cleaned_lines.append(current_paragraph.strip())
+    if paragraph_parts:
+        cleaned_lines.append(" ".join(paragraph_parts).strip())
     
     return '\n\n'.join(cleaned_lines)
 
 
 def is_figure_caption(text: str) -> bool:
     """Check if text is a figure caption."""
-    text_lower = text.lower()
-    return (text_lower.startswith('figure ') or 
-            text_lower.startswith('fig.') or
-            text_lower.startswith('table ') or
-            text_lower.startswith('equation ') or
-            re.match(r'^(figure|fig\.?|table|equation)\s+\d+', text_lower))
+    return _FIG.match(text) is not None
+
+
+def _is_page_number(text: str) -> bool:
+    """A bare 3-4 digit page number (text already stripped)."""
+    return text.isdecimal() and 3 <= len(text) <= 4
 
 
 def is_citation_or_footer(text: str) -> bool:
     """Check if text is citation, session info, or footer material."""
-    text_lower = text.lower().strip()
-    
-    # Session information
-    if 'session' in text_lower and ('brain' in text_lower or 'taste' in text_lower):
-        return True
-    
-    # Conference/journal info
-    if re.match(r'.*\d{4}.*', text) and ('uist' in text_lower or 'acm' in text_lower or 'ieee' in text_lower):
-        return True
-    
-    # Page numbers
-    if re.match(r'^\d{3,4}$', text.strip()):
-        return True
-    
-    # Permission statements
-    if 'permission' in text_lower and ('make digital' in text_lower or 'copyright' in text_lower):
-        return True
-    
-    # DOI, ISBN, etc.
-    if re.match(r'.*(doi|isbn|issn).*:', text_lower):
-        return True
-    
-    return False
+    text = text.strip()
+    return _is_page_number(text) or _CITE.match(text) is not None
 
 
 def is_mathematical_equation(text: str) -> bool:
     """Check if text contains mathematical equations."""
-    # Look for mathematical symbols and patterns
-    math_patterns = [
-        r'[=<>≤≥≠±∞∑∏∫]',  # Mathematical operators
-        r'[α-ωΑ-Ω]',  # Greek letters
-        r'\^?\d+\s*=\s*',  # Equation patterns
-        r'[a-zA-Z]_[a-zA-Z0-9]+',  # Subscripts
-        r'[a-zA-Z]\^[a-zA-Z0-9]+',  # Superscripts
-        r'log\s+[a-zA-Z]',  # Logarithms
-        r'\([0-9]+\)$'  # Equation numbers
-    ]
-    
-    return any(re.search(pattern, text) for pattern in math_patterns)
+    return _MATH.match(text) is not None
+
+
+def classify_line(text: str) -> Optional[str]:
+    """Return 'cite', 'fig', 'math' or None for a stripped line of text."""
+    if _is_page_number(text):
+        return 'cite'
+    m = _CLASSIFY.match(text)
+    return m.lastgroup if m else None
+
+
+# Markdown prefix for each heading kind assigned by _line_kind
+_HEADING_PREFIX = {'head1': "# ", 'head2': "## ", 'head3': "### "}
+
+
+def _line_kind(text: str, font_size: float, is_bold: bool) -> str:
+    """Classify a line once: 'cite', 'fig', 'math', 'head1'-'head3' or 'para'."""
+    kind = classify_line(text)
+    if kind:
+        return kind
+    # Large font or bold large text = main heading
+    if font_size > 16 or (is_bold and font_size > 14):
+        return 'head1'
+    # Medium font or bold medium text = subheading
+    if font_size > 13 or (is_bold and font_size > 11):
+        return 'head2'
+    # Small bold text = minor heading or emphasis
+    if is_bold and len(text) < 100:  # Short bold text likely a heading
+        return 'head3'
+    return 'para'
 
 
 def format_structured_text(text_dict: Dict, page_num: int) -> str:
     """Format text from PyMuPDF text dict with better structure preservation."""
     # Check if page numbers should be included
-    include_page_numbers = os.environ.get("PDF_INCLUDE_PAGE_NUMBERS", "false").lower() in ("true", "1", "yes")
-    
-    if include_page_numbers:
-        result = f"\n\n---\n\n## Page {page_num}\n\n"
+    if _INCLUDE_PAGE_NUMBERS:
+        parts = [f"\n\n---\n\n## Page {page_num}\n\n"]
     else:
-        result = "\n\n"  # Just add some spacing without page numbers
+        parts = ["\n\n"]  # Just add some spacing without page numbers
     
     # Collect text blocks first, then process them for better paragraph structure
     text_blocks = []
@@ -423,32 +834,26 @@ def format_structured_text(text_dict: Dict, page_num: int) -> str:
             block_lines = []
             
             for line in block.get("lines", []):
-                line_text = ""
+                span_texts = []
                 max_font_size = 0
-                is_bold = False
-                is_italic = False
+                line_flags = 0
                 
                 for span in line.get("spans", []):
                     text = span.get("text", "").strip()
                     if text:
-                        font_size = span.get("size", 12)
-                        font_flags = span.get("flags", 0)
-                        max_font_size = max(max_font_size, font_size)
-                        
-                        # Check formatting flags
-                        if font_flags & 16:  # Bold
-                            is_bold = True
-                        if font_flags & 2:   # Italic
-                            is_italic = True
-                        
-                        line_text += text + " "
+                        max_font_size = max(max_font_size, span.get("size", 12))
+                        line_flags |= span.get("flags", 0)
+                        span_texts.append(text)
                 
-                if line_text.strip():
+                if span_texts:
+                    line_text = " ".join(span_texts)
+                    is_bold = bool(line_flags & 16)
+                    # Each line is tagged once here, while size/flags are at hand
                     block_lines.append({
-                        'text': line_text.strip(),
-                        'font_size': max_font_size,
+                        'text': line_text,
+                        'kind': _line_kind(line_text, max_font_size, is_bold),
                         'is_bold': is_bold,
-                        'is_italic': is_italic
+                        'is_italic': bool(line_flags & 2)
                     })
             
             if block_lines:
@@ -462,95 +867,53 @@ def format_structured_text(text_dict: Dict, page_num: int) -> str:
         current_group = []
         
         for line_info in block_lines:
+            kind = line_info['kind']
             clean_text = line_info['text']
-            max_font_size = line_info['font_size']
-            is_bold = line_info['is_bold']
-            is_italic = line_info['is_italic']
             
-            # Check for special content types
-            if is_citation_or_footer(clean_text):
-                # Output any accumulated paragraph text first
-                if current_group:
-                    paragraph_text = " ".join([item['text'] for item in current_group])
-                    paragraph_text = clean_paragraph_text(paragraph_text)
-                    if paragraph_text:
-                        result += paragraph_text + "\n\n"
-                    current_group = []
-                
-                # Skip citation/footer content or format it specially
-                if len(clean_text) > 20:  # Only include substantial citation text
-                    result += f"*{clean_text}*\n\n"
+            # Accumulate regular text for paragraph formation
+            if kind == 'para':
+                # If we have accumulated figure caption parts, output them
+                if figure_caption_buffer:
+                    parts.append(f"**{' '.join(figure_caption_buffer)}**\n\n")
+                    figure_caption_buffer = []
+                current_group.append(line_info)
                 continue
             
+            # Every other kind ends the paragraph: output accumulated text first
+            if current_group:
+                paragraph_text = " ".join([item['text'] for item in current_group])
+                paragraph_text = clean_paragraph_text(paragraph_text)
+                if paragraph_text:
+                    parts.append(paragraph_text + "\n\n")
+                current_group = []
+            
             # Handle figure captions - they often span multiple lines
-            if is_figure_caption(clean_text):
-                # Output any accumulated paragraph text first
-                if current_group:
-                    paragraph_text = " ".join([item['text'] for item in current_group])
-                    paragraph_text = clean_paragraph_text(paragraph_text)
-                    if paragraph_text:
-                        result += paragraph_text + "\n\n"
-                    current_group = []
-                
+            if kind == 'fig':
                 figure_caption_buffer.append(clean_text)
                 continue
             
+            if kind == 'cite':
+                # Skip citation/footer content or format it specially
+                if len(clean_text) > 20:  # Only include substantial citation text
+                    parts.append(f"*{clean_text}*\n\n")
+                continue
+            
             # If we have accumulated figure caption parts, output them
             if figure_caption_buffer:
-                caption_text = " ".join(figure_caption_buffer)
-                result += f"**{caption_text}**\n\n"
+                parts.append(f"**{' '.join(figure_caption_buffer)}**\n\n")
                 figure_caption_buffer = []
             
-            # Handle mathematical equations
-            if is_mathematical_equation(clean_text):
-                # Output any accumulated paragraph text first
-                if current_group:
-                    paragraph_text = " ".join([item['text'] for item in current_group])
-                    paragraph_text = clean_paragraph_text(paragraph_text)
-                    if paragraph_text:
-                        result += paragraph_text + "\n\n"
-                    current_group = []
-                
+            if kind == 'math':
                 # Format equation with proper spacing
-                if re.search(r'\([0-9]+\)$', clean_text):
+                if _EQ_NUMBER.search(clean_text):
                     # Numbered equation
-                    result += f"```\n{clean_text}\n```\n\n"
+                    parts.append(f"```\n{clean_text}\n```\n\n")
                 else:
                     # Inline equation
-                    result += f"*{clean_text}*\n\n"
-                continue
-            
-            # Determine if this is a heading
-            is_heading = False
-            heading_level = ""
-            
-            # Large font or bold large text = main heading
-            if max_font_size > 16 or (is_bold and max_font_size > 14):
-                is_heading = True
-                heading_level = "# "
-            # Medium font or bold medium text = subheading  
-            elif max_font_size > 13 or (is_bold and max_font_size > 11):
-                is_heading = True
-                heading_level = "## "
-            # Small bold text = minor heading or emphasis
-            elif is_bold and len(clean_text) < 100:  # Short bold text likely a heading
-                is_heading = True
-                heading_level = "### "
-            
-            if is_heading:
-                # Output any accumulated paragraph text first
-                if current_group:
-                    paragraph_text = " ".join([item['text'] for item in current_group])
-                    paragraph_text = clean_paragraph_text(paragraph_text)
-                    if paragraph_text:
-                        result += paragraph_text + "\n\n"
-                    current_group = []
-                
-                # Output the heading
-                result += f"\n{heading_level}{clean_text}\n\n"
+                    parts.append(f"*{clean_text}*\n\n")
             else:
-                # Accumulate regular text for paragraph formation
-                current_group.append(line_info)
+                # Output the heading
+                parts.append(f"\n{_HEADING_PREFIX[kind]}{clean_text}\n\n")
         
         # Output any remaining paragraph text
         if current_group:
@@ -564,12 +927,12 @@ def format_structured_text(text_dict: Dict, page_num: int) -> str:
                 elif first_item['is_bold']:
                     paragraph_text = f"**{paragraph_text}**"
                 
-                result += paragraph_text + "\n\n"
+                parts.append(paragraph_text + "\n\n")
         
         # Output any remaining figure captions
         if figure_caption_buffer:
             caption_text = " ".join(figure_caption_buffer)
-            result += f"**{caption_text}**\n\n"
+            parts.append(f"**{caption_text}**\n\n")
             figure_caption_buffer = []
     
-    return result
+    return ''.join(parts)
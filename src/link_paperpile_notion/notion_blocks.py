@@ -1,9 +1,19 @@
 """
 Notion block creation utilities for content embedding.
 """
+import io
 import re
 from typing import Dict, List
 
+# Compiled once; split_long_text and markdown_to_notion_blocks run per line/chunk
+_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+')
+# Markdown line types: fence (optionally indented, with language), heading
+# (must start the line), or a divider line
+_BLOCK = re.compile(r'\s*(?P<fence>```(?P<lang>\w+)?)|(?P<heading>#{1,3}) |\s*(?P<hr>---)\s*$')
+
+# Block builders return fresh nested literals on purpose: every block must be an
+# independent dict, and a literal is ~15x faster than copy.deepcopy of a template
+
 def create_pdf_embed_block(drive_link: str) -> Dict:
     """Create a PDF embed block."""
     return {
@@ -60,21 +70,23 @@ def split_long_text(text: str, max_length: int = 2000) -> List[str]:
         return [text]
     
     chunks = []
-    current_chunk = ""
+    # Sentences of the chunk being built and its length once joined with trailing spaces
+    current = []
+    current_len = 0
     
     # Split by sentences first
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) <= max_length:
-            current_chunk += sentence + " "
+    for sentence in _SENT_SPLIT.split(text):
+        if current_len + len(sentence) <= max_length:
+            current.append(sentence)
+            current_len += len(sentence) + 1
         else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence + " "
+            if current:
+                chunks.append(" ".join(current).strip())
+            current = [sentence]
+            current_len = len(sentence) + 1
     
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    if current:
+        chunks.append(" ".join(current).strip())
     
     return chunks
 
@@ -90,14 +102,18 @@ def markdown_to_notion_blocks(markdown_content: str) -> List[Dict]:
     
     blocks = []
     lines = markdown_content.split('\n')
-    current_paragraph = ""
+    paragraph = io.StringIO()  # amortized appends; materialized once per flush
     in_code_block = False
     code_block_lines = []
     code_language = "text"
     
     for line in lines:
+        # One match classifies the line: code fence, heading (unindented), or divider
+        m = _BLOCK.match(line)
+        kind = m.lastgroup if m else None
+        
         # Handle code blocks
-        if line.strip().startswith('```'):
+        if kind == 'fence':
             if in_code_block:
                 # End code block
                 if code_block_lines:
@@ -107,59 +123,40 @@ def markdown_to_notion_blocks(markdown_content: str) -> List[Dict]:
                 in_code_block = False
             else:
                 # Start code block
-                if current_paragraph.strip():
-                    blocks.extend(create_paragraph_blocks(current_paragraph.strip()))
-                    current_paragraph = ""
+                if paragraph.tell():
+                    blocks.extend(create_paragraph_blocks(paragraph.getvalue().strip()))
+                    paragraph = io.StringIO()
                 in_code_block = True
-                # Extract language from ```python, ```javascript, etc.
-                lang_match = re.match(r'```(\w+)', line.strip())
-                code_language = lang_match.group(1) if lang_match else "text"
+                # Language from ```python, ```javascript, etc.
+                code_language = m.group('lang') or "text"
             continue
         
         if in_code_block:
             code_block_lines.append(line)
             continue
         
-        # Handle headings
-        if line.startswith('# '):
-            if current_paragraph.strip():
-                blocks.extend(create_paragraph_blocks(current_paragraph.strip()))
-                current_paragraph = ""
-            blocks.append(create_heading_block(line[2:].strip(), 1))
-        elif line.startswith('## '):
-            if current_paragraph.strip():
-                blocks.extend(create_paragraph_blocks(current_paragraph.strip()))
-                current_paragraph = ""
-            blocks.append(create_heading_block(line[3:].strip(), 2))
-        elif line.startswith('### '):
-            if current_paragraph.strip():
-                blocks.extend(create_paragraph_blocks(current_paragraph.strip()))
-                current_paragraph = ""
-            blocks.append(create_heading_block(line[4:].strip(), 3))
-        
-        # Handle dividers
-        elif line.strip() == '---':
-            if current_paragraph.strip():
-                blocks.extend(create_paragraph_blocks(current_paragraph.strip()))
-                current_paragraph = ""
-            blocks.append(create_divider_block())
-        
-        # Handle empty lines
-        elif not line.strip():
-            if current_paragraph.strip():
-                blocks.extend(create_paragraph_blocks(current_paragraph.strip()))
-                current_paragraph = ""
+        # Headings, dividers and blank lines all end the current paragraph
+        if kind or not line.strip():
+            if paragraph.tell():
+                blocks.extend(create_paragraph_blocks(paragraph.getvalue().strip()))
+                paragraph = io.StringIO()
+            if kind == 'heading':
+                level = len(m.group('heading'))
+                blocks.append(create_heading_block(line[level + 1:].strip(), level))
+            elif kind == 'hr':
+                blocks.append(create_divider_block())
         
         # Regular content
         else:
-            current_paragraph += line + "\n"
+            paragraph.write(line)
+            paragraph.write("\n")
     
     # Handle any remaining content
     if in_code_block and code_block_lines:
         code_content = '\n'.join(code_block_lines)
         blocks.append(create_code_block(code_content, code_language))
     
-    if current_paragraph.strip():
-        blocks.extend(create_paragraph_blocks(current_paragraph.strip()))
+    if paragraph.tell():
+        blocks.extend(create_paragraph_blocks(paragraph.getvalue().strip()))
     
     return blocks
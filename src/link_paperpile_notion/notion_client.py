@@ -4,23 +4,300 @@ Notion API client functions for creating and updating pages.
 import os
 import json
 import time
+import hashlib
+import atexit
+import logging
+import sqlite3
+import threading
+import functools
 import requests
-from typing import Dict, List, Optional, Any
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Any, Tuple, Mapping, Set
 from pathlib import Path
+from collections import Counter
+
+# orjson is optional; request bodies fall back to requests' stdlib encoding
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
+log = logging.getLogger(__name__)
 
 NOTION_API_BASE = "https://api.notion.com/v1"
 NOTION_VERSION = "2022-06-28"
 
-def notion_headers(token: str) -> Dict[str, str]:
-    """Generate headers for Notion API requests."""
-    return {
+def _retrying_adapter(status_forcelist: List[int]) -> HTTPAdapter:
+    """Pooled adapter that retries the given statuses with exponential backoff."""
+    return HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=status_forcelist,
+            allowed_methods=frozenset(["GET", "POST", "PATCH"]),
+        ),
+    )
+
+def build_http_session() -> requests.Session:
+    """Build a pooled HTTP session with retries for transient failures."""
+    session = requests.Session()
+    session.mount("https://", _retrying_adapter([429, 500, 502, 503, 504]))
+    # Notion 429s are left to _notion_request so one Retry-After pauses every worker
+    session.mount(NOTION_API_BASE, _retrying_adapter([500, 502, 503, 504]))
+    return session
+
+# Shared session so every request reuses pooled keep-alive connections
+SESSION = build_http_session()
+
+class NotionRateLimiter:
+    """Thread-safe token bucket: ``rate`` calls per second, bursts of up to ``burst``.
+    
+    ``penalize`` stops every caller for a while, e.g. for a 429's Retry-After.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+    
+    def penalize(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # Resume at the steady rate instead of bursting once the pause ends
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+# Notion allows an average of ~3 requests per second per integration
+_NOTION_LIMITER = NotionRateLimiter(3, burst=3)
+_MAX_RATE_LIMIT_RETRIES = 5
+
+# Per-run outcome counts; per-page results are logged at DEBUG and summarized
+# once at the end via notion_stats() instead of a line per call
+_STATS: Counter = Counter()
+_STATS_LOCK = threading.Lock()
+
+def _count(key: str) -> None:
+    with _STATS_LOCK:
+        _STATS[key] += 1
+
+def notion_stats() -> Dict[str, int]:
+    """Snapshot of this run's Notion outcome counters."""
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+# (page_id, digest of the sent properties) for every PATCH this run; a repeat
+# of an identical update is skipped
+_PATCH_SEEN: Set[Tuple[str, bytes]] = set()
+_PATCH_LOCK = threading.Lock()
+
+# Notion caps compound filters at 100 conditions; stay safely below it
+_OR_FILTER_BATCH = 90
+
+# Per-name locks serialize find-or-create of the *same* author (no duplicates)
+# while different names resolve concurrently; _AUTHOR_LOCK guards the lock map
+_AUTHOR_LOCK = threading.Lock()
+_AUTHOR_NAME_LOCKS: Dict[Tuple[str, str], threading.Lock] = {}
+
+# Author misses of one entry are looked up in parallel; the shared rate
+# limiter still caps request starts, but their round-trips overlap
+_AUTHOR_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notion-author")
+
+# Process-wide (authors_db, full name) -> author page ID memo, so a prolific
+# co-author is looked up at most once per run even without an authors_index
+_AUTHOR_CACHE: Dict[Tuple[str, str], str] = {}
+
+# Persistent UID/author -> page ID maps so later runs skip rediscovery queries;
+# a mapping is dropped when its page turns out to be deleted or archived
+_ID_CACHE_DB: Optional[sqlite3.Connection] = None
+_ID_CACHE_LOCK = threading.Lock()
+_ID_CACHE_OPENED = False
+
+def _id_cache() -> Optional[sqlite3.Connection]:
+    """Open the page-ID cache once, or None when NOTION_CACHE=false or it is unusable."""
+    global _ID_CACHE_DB, _ID_CACHE_OPENED
+    with _ID_CACHE_LOCK:
+        if not _ID_CACHE_OPENED:
+            _ID_CACHE_OPENED = True
+            if os.environ.get("NOTION_CACHE", "true").lower() in ("true", "1", "yes"):
+                cache_dir = Path(os.environ.get("NOTION_CACHE_DIR") or Path.home() / ".cache" / "link_paperpile_notion").expanduser()
+                try:
+                    cache_dir.mkdir(parents=True, exist_ok=True)
+                    db = sqlite3.connect(str(cache_dir / "cache.sqlite"), isolation_level=None, check_same_thread=False)
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("CREATE TABLE IF NOT EXISTS uid_map (dbid TEXT, uid TEXT, page_id TEXT, PRIMARY KEY (dbid, uid))")
+                    db.execute("CREATE TABLE IF NOT EXISTS author_map (authors_db TEXT, name TEXT, page_id TEXT, PRIMARY KEY (authors_db, name))")
+                    _ID_CACHE_DB = db
+                    atexit.register(db.close)
+                except sqlite3.Error as e:
+                    log.warning("⚠️  [CACHE] Notion ID cache disabled: %s", e)
+        return _ID_CACHE_DB
+
+def _cache_lookup(table: str, scope_col: str, key_col: str, scope: str, keys: List[str]) -> Dict[str, str]:
+    db = _id_cache()
+    if db is None or not keys:
+        return {}
+    found = {}
+    with _ID_CACHE_LOCK:
+        # Stay under SQLite's default bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = db.execute(f"SELECT {key_col}, page_id FROM {table} WHERE {scope_col} = ? AND {key_col} IN ({marks})",
+                              [scope, *chunk])
+            found.update(rows)
+    return found
+
+def _cache_store(table: str, scope: str, mapping: Dict[str, str]) -> None:
+    db = _id_cache()
+    if db is None or not mapping:
+        return
+    with _ID_CACHE_LOCK:
+        db.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)",
+                       [(scope, key, page_id) for key, page_id in mapping.items()])
+
+def _cache_forget_page(page_id: str) -> None:
+    """Drop every cached mapping that points at ``page_id``."""
+    db = _id_cache()
+    if db is None:
+        return
+    with _ID_CACHE_LOCK:
+        db.execute("DELETE FROM uid_map WHERE page_id = ?", (page_id,))
+        db.execute("DELETE FROM author_map WHERE page_id = ?", (page_id,))
+
+class NotionPageGone(Exception):
+    """The page being updated was deleted or archived in Notion."""
+
+def _page_gone(r: requests.Response) -> bool:
+    """True if a page request failed because the page was deleted or archived."""
+    return r.status_code == 404 or (r.status_code == 400 and "archived" in r.text)
+
+def _stale_author_ids(r: requests.Response, author_ids: Optional[List[str]]) -> List[str]:
+    """Author IDs a failed create/update blames, e.g. an author page deleted since it was cached."""
+    if not author_ids or r.status_code not in (400, 404):
+        return []
+    text = r.text.replace("-", "")
+    named = [aid for aid in author_ids if aid.replace("-", "") in text]
+    if named:
+        return named
+    # The error is about the relation but names no page; distrust all of them
+    return list(author_ids) if "relation" in r.text.lower() else []
+
+def _forget_authors(authors_db: str, author_ids: List[str], authors_index: Optional[Dict[str, str]]) -> None:
+    """Drop stale author page IDs from every author cache so they are resolved again."""
+    stale = set(author_ids)
+    with _AUTHOR_LOCK:
+        for key in [key for key, aid in list(_AUTHOR_CACHE.items()) if key[0] == authors_db and aid in stale]:
+            _AUTHOR_CACHE.pop(key, None)
+    if authors_index is not None:
+        for name in [name for name, aid in list(authors_index.items()) if aid in stale]:
+            authors_index.pop(name, None)
+    for aid in stale:
+        _cache_forget_page(aid)
+
+def _refresh_stale_authors(r: requests.Response, token: str, authors_db: Optional[str], entry: Dict,
+                           author_ids: Optional[List[str]],
+                           authors_index: Optional[Dict[str, str]]) -> Optional[List[str]]:
+    """Re-resolved author IDs if ``r`` failed on a stale author relation, else None."""
+    stale = _stale_author_ids(r, author_ids)
+    if not stale or not authors_db:
+        return None
+    log.warning("⚠️  [NOTION] %s cached author page(s) are gone; resolving authors again", len(stale))
+    _forget_authors(authors_db, stale, authors_index)
+    return notion_author_relation_ids(token, authors_db, entry["authors"], authors_index)
+
+@functools.lru_cache(maxsize=4)
+def notion_headers(token: str) -> Mapping[str, str]:
+    """Generate headers for Notion API requests (built once per token, read-only)."""
+    return MappingProxyType({
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
         "Notion-Version": NOTION_VERSION,
-    }
+    })
+
+def _retry_after(r: requests.Response) -> float:
+    try:
+        return max(float(r.headers.get("Retry-After", "1")), 0.0)
+    except ValueError:
+        return 1.0
+
+def _notion_request(method: str, url: str, token: str, payload: Optional[Dict] = None) -> requests.Response:
+    """Send one rate-limited request to the Notion API over the shared session.
+    
+    A 429 pauses the shared limiter for its Retry-After and the request is
+    retried; other transient errors are retried by the session's adapter.
+    """
+    if payload is not None and _ORJSON_AVAILABLE:
+        # Encode straight to bytes in C; large block lists dominate otherwise
+        body = {"data": orjson.dumps(payload)}
+    else:
+        body = {"json": payload}
+    
+    for attempt in range(_MAX_RATE_LIMIT_RETRIES + 1):
+        _NOTION_LIMITER.acquire()
+        r = SESSION.request(method, url, headers=notion_headers(token), **body)
+        if r.status_code != 429 or attempt == _MAX_RATE_LIMIT_RETRIES:
+            return r
+        _count("rate_limited")
+        _NOTION_LIMITER.penalize(_retry_after(r))
+    return r
+
+def notion_find_or_create_author(token: str, authors_db: str, full_name: str,
+                                 authors_index: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """Find or create an author in the authors database.
+    
+    If ``authors_index`` (name -> page ID) is given it is consulted first and
+    updated with any author that had to be looked up or created.
+    """
+    key = (authors_db, full_name)
+    if authors_index is not None and full_name in authors_index:
+        return authors_index[full_name]
+    if key in _AUTHOR_CACHE:
+        return _AUTHOR_CACHE[key]
+    
+    with _AUTHOR_LOCK:
+        name_lock = _AUTHOR_NAME_LOCKS.setdefault(key, threading.Lock())
+    with name_lock:
+        # Another worker may have resolved this name while we waited
+        if authors_index is not None and full_name in authors_index:
+            return authors_index[full_name]
+        if key in _AUTHOR_CACHE:
+            return _AUTHOR_CACHE[key]
+        author_id = _find_or_create_author(token, authors_db, full_name)
+        if author_id:
+            _AUTHOR_CACHE[key] = author_id
+            if authors_index is not None:
+                authors_index[full_name] = author_id
+        return author_id
 
-def notion_find_or_create_author(token: str, authors_db: str, full_name: str) -> Optional[str]:
-    """Find or create an author in the authors database."""
+def _find_or_create_author(token: str, authors_db: str, full_name: str) -> Optional[str]:
+    cached = _cache_lookup("author_map", "authors_db", "name", authors_db, [full_name])
+    if cached:
+        return cached[full_name]
+    
     # Search by name equals full_name
     url = f"{NOTION_API_BASE}/databases/{authors_db}/query"
     payload = {
@@ -30,13 +307,15 @@ def notion_find_or_create_author(token: str, authors_db: str, full_name: str) ->
         },
         "page_size": 1,
     }
-    r = requests.post(url, headers=notion_headers(token), data=json.dumps(payload))
+    r = _notion_request("POST", url, token, payload)
     r.raise_for_status()
     results = r.json().get("results", [])
-    if results:
-        return results[0]["id"]
-    
-    # Create new author
+    author_id = results[0]["id"] if results else _create_author(token, authors_db, full_name)
+    if author_id:
+        _cache_store("author_map", authors_db, {full_name: author_id})
+    return author_id
+
+def _create_author(token: str, authors_db: str, full_name: str) -> Optional[str]:
     url = f"{NOTION_API_BASE}/pages"
     payload = {
         "parent": {"database_id": authors_db},
@@ -44,12 +323,124 @@ def notion_find_or_create_author(token: str, authors_db: str, full_name: str) ->
             "Name": {"title": [{"text": {"content": full_name}}]},
         }
     }
-    r = requests.post(url, headers=notion_headers(token), data=json.dumps(payload))
+    r = _notion_request("POST", url, token, payload)
     r.raise_for_status()
     return r.json().get("id")
 
+def notion_load_authors_index(token: str, authors_db: str) -> Dict[str, str]:
+    """Page through the authors database once and map each name to its page ID."""
+    url = f"{NOTION_API_BASE}/databases/{authors_db}/query"
+    payload = {"page_size": 100}
+    
+    authors_index = {}
+    while True:
+        r = _notion_request("POST", url, token, payload)
+        if not r.ok:
+            raise Exception(f"Notion query failed: {r.status_code} {r.text}")
+        
+        data = r.json()
+        for page in data.get("results", []):
+            title = page.get("properties", {}).get("Name", {}).get("title", [])
+            name = "".join(t.get("plain_text", "") for t in title)
+            if name:
+                authors_index.setdefault(name, page["id"])
+        
+        if not data.get("has_more"):
+            break
+        payload["start_cursor"] = data["next_cursor"]
+    
+    log.info("✅ [NOTION] Indexed %s existing authors", len(authors_index))
+    return authors_index
+
+def prime_author_cache(token: str, authors_db: str) -> int:
+    """Bulk-load the authors database into the author cache; returns the number of names."""
+    authors_index = notion_load_authors_index(token, authors_db)
+    with _AUTHOR_LOCK:
+        for name, page_id in authors_index.items():
+            _AUTHOR_CACHE.setdefault((authors_db, name), page_id)
+    return len(authors_index)
+
+def resolve_authors(token: str, authors_db: str, entries: List[Dict]) -> Dict[str, str]:
+    """Resolve every author of ``entries`` up front; returns name -> author page ID.
+    
+    Names are looked up with batched ``or``-filter queries and the missing ones
+    are created concurrently, so per-entry relation building is dict lookups.
+    """
+    names = list(dict.fromkeys(author["full"] for e in entries for author in e.get("authors") or []))
+    authors_index = {name: _AUTHOR_CACHE[(authors_db, name)] for name in names if (authors_db, name) in _AUTHOR_CACHE}
+    authors_index.update(_cache_lookup("author_map", "authors_db", "name", authors_db,
+                                       [name for name in names if name not in authors_index]))
+    wanted = [name for name in names if name not in authors_index]
+    
+    url = f"{NOTION_API_BASE}/databases/{authors_db}/query"
+    for start in range(0, len(wanted), _OR_FILTER_BATCH):
+        chunk = wanted[start:start + _OR_FILTER_BATCH]
+        payload = {
+            "filter": {
+                "or": [{"property": "Name", "title": {"equals": name}} for name in chunk]
+            },
+            "page_size": 100
+        }
+        while True:
+            r = _notion_request("POST", url, token, payload)
+            if not r.ok:
+                raise Exception(f"Notion query failed: {r.status_code} {r.text}")
+            
+            data = r.json()
+            for page in data.get("results", []):
+                title = page.get("properties", {}).get("Name", {}).get("title", [])
+                authors_index.setdefault("".join(t.get("plain_text", "") for t in title), page["id"])
+            
+            if not data.get("has_more"):
+                break
+            payload["start_cursor"] = data["next_cursor"]
+    
+    # Names are unique here, so creates can run in parallel without duplicates
+    missing = [name for name in wanted if name not in authors_index]
+    futures = {name: _AUTHOR_POOL.submit(_create_author, token, authors_db, name) for name in missing}
+    for name, future in futures.items():
+        author_id = future.result()
+        if author_id:
+            authors_index[name] = author_id
+    _cache_store("author_map", authors_db, {name: authors_index[name] for name in wanted if name in authors_index})
+    
+    with _AUTHOR_LOCK:
+        for name in names:
+            if name in authors_index:
+                _AUTHOR_CACHE.setdefault((authors_db, name), authors_index[name])
+    
+    log.info("✅ [NOTION] Resolved %s authors (%s created)", len(names), len(missing))
+    return authors_index
+
+def notion_author_relation_ids(token: str, authors_db: str, authors: List[Dict],
+                               authors_index: Optional[Dict[str, str]] = None) -> List[str]:
+    """Resolve entry authors to author page IDs, creating missing authors."""
+    names = [author["full"] for author in authors]
+    
+    def cached(name: str) -> Optional[str]:
+        if authors_index is not None and name in authors_index:
+            return authors_index[name]
+        return _AUTHOR_CACHE.get((authors_db, name))
+    
+    # Fan out only the names that need a Notion round-trip; keep author order
+    resolved = {name: cached(name) for name in names}
+    misses = [name for name, author_id in resolved.items() if author_id is None]
+    if len(misses) == 1:
+        resolved[misses[0]] = notion_find_or_create_author(token, authors_db, misses[0], authors_index)
+    elif misses:
+        futures = {name: _AUTHOR_POOL.submit(notion_find_or_create_author, token, authors_db, name, authors_index)
+                   for name in misses}
+        for name, future in futures.items():
+            resolved[name] = future.result()
+    
+    return [resolved[name] for name in names if resolved[name]]
+
 def notion_query_by_uid(token: str, dbid: str, uid: str) -> Optional[str]:
     """Query Notion database by UID to find existing page."""
+    cached = _cache_lookup("uid_map", "dbid", "uid", dbid, [uid])
+    if cached:
+        return cached[uid]
+    
     url = f"{NOTION_API_BASE}/databases/{dbid}/query"
     payload = {
         "filter": {
@@ -59,106 +450,238 @@ def notion_query_by_uid(token: str, dbid: str, uid: str) -> Optional[str]:
         "page_size": 1
     }
     
-    r = requests.post(url, headers=notion_headers(token), data=json.dumps(payload))
+    r = _notion_request("POST", url, token, payload)
     if not r.ok:
         raise Exception(f"Notion query failed: {r.status_code} {r.text}")
     
     results = r.json().get("results", [])
-    return results[0]["id"] if results else None
+    if not results:
+        return None
+    _cache_store("uid_map", dbid, {uid: results[0]["id"]})
+    return results[0]["id"]
 
-def notion_create_page(token: str, dbid: str, entry: Dict, authors_db: Optional[str]) -> str:
-    """Create a new page in Notion database."""
-    url = f"{NOTION_API_BASE}/pages"
+def notion_query_by_uids(token: str, dbid: str, uids: List[str],
+                         page_properties: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, str]:
+    """Resolve many UIDs to page IDs with batched ``or``-filter queries.
     
-    # Build properties
-    properties = {
-        "Title": {"title": [{"text": {"content": entry.get("title", "Untitled")}}]},
-        "UID": {"rich_text": [{"text": {"content": entry["uid"]}}]},
-        "Type": {"select": {"name": "Resource"}},
-        "PubType": {"select": {"name": entry.get("type_norm", "Other")}},
-        "Year": {"number": entry.get("year")},
-        "Venue": {"rich_text": [{"text": {"content": entry.get("venue", "")}}]},
-    }
+    If ``page_properties`` is given it is filled with each queried UID's current
+    page properties, so updates can be compared against them without a GET.
+    UIDs found in the on-disk ID cache are not queried and get no properties;
+    fetch those with ``notion_get_page_properties`` when they are needed.
+    """
+    url = f"{NOTION_API_BASE}/databases/{dbid}/query"
+    uids = list(dict.fromkeys(uids))
+    
+    uid_index = _cache_lookup("uid_map", "dbid", "uid", dbid, uids)
+    wanted = [uid for uid in uids if uid not in uid_index]
+    for start in range(0, len(wanted), _OR_FILTER_BATCH):
+        chunk = wanted[start:start + _OR_FILTER_BATCH]
+        payload = {
+            "filter": {
+                "or": [{"property": "UID", "rich_text": {"equals": uid}} for uid in chunk]
+            },
+            "page_size": 100
+        }
+        while True:
+            r = _notion_request("POST", url, token, payload)
+            if not r.ok:
+                raise Exception(f"Notion query failed: {r.status_code} {r.text}")
+            
+            data = r.json()
+            for page in data.get("results", []):
+                texts = page.get("properties", {}).get("UID", {}).get("rich_text", [])
+                if texts:
+                    uid_index[texts[0]["plain_text"]] = page["id"]
+                    if page_properties is not None:
+                        page_properties[texts[0]["plain_text"]] = page.get("properties", {})
+            
+            if not data.get("has_more"):
+                break
+            payload["start_cursor"] = data["next_cursor"]
+    _cache_store("uid_map", dbid, {uid: uid_index[uid] for uid in wanted if uid in uid_index})
+    
+    log.info("✅ [NOTION] Resolved %s of %s UIDs to existing pages", len(uid_index), len(uids))
+    return uid_index
+
+def _build_properties(entry: Dict, *, for_update: bool,
+                      author_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Build the page properties for an entry, leaving out fields it lacks.
     
-    # Add DOI if present (as URL format)
-    if entry.get("doi"):
-        doi_url = f"https://doi.org/{entry['doi']}" if not entry["doi"].startswith("http") else entry["doi"]
-        properties["DOI"] = {"url": doi_url}
+    A new page starts blank, so an absent Year/Venue is omitted on create;
+    updates still send them so a value removed in Paperpile is cleared.
+    """
+    properties = {"Title": {"title": [{"text": {"content": entry.get("title", "Untitled")}}]}}
+    if not for_update:
+        properties["UID"] = {"rich_text": [{"text": {"content": entry["uid"]}}]}
+    properties["Type"] = {"select": {"name": "Resource"}}
+    properties["PubType"] = {"select": {"name": entry.get("type_norm", "Other")}}
     
-    # Add URL if present
+    year = entry.get("year")
+    if year is not None or for_update:
+        properties["Year"] = {"number": year}
+    venue = entry.get("venue") or ""
+    if venue or for_update:
+        properties["Venue"] = {"rich_text": [{"text": {"content": venue}}]}
+    
+    # DOI is stored in URL form
+    doi = entry.get("doi")
+    if doi:
+        properties["DOI"] = {"url": doi if doi.startswith("http") else f"https://doi.org/{doi}"}
     if entry.get("url"):
         properties["URL"] = {"url": entry["url"]}
+    if author_ids:
+        properties["Authors"] = {"relation": [{"id": aid} for aid in author_ids]}
+    return properties
+
+def notion_create_page(token: str, dbid: str, entry: Dict, authors_db: Optional[str],
+                       authors_index: Optional[Dict[str, str]] = None) -> str:
+    """Create a new page in Notion database."""
+    url = f"{NOTION_API_BASE}/pages"
     
     # Add authors if present (as relation if authors_db is provided)
+    author_ids = None
     if entry.get("authors") and authors_db:
-        author_relation_ids = []
-        for author in entry["authors"]:
-            author_id = notion_find_or_create_author(token, authors_db, author["full"])
-            if author_id:
-                author_relation_ids.append(author_id)
-        if author_relation_ids:
-            properties["Authors"] = {"relation": [{"id": aid} for aid in author_relation_ids]}
+        author_ids = notion_author_relation_ids(token, authors_db, entry["authors"], authors_index)
+    properties = _build_properties(entry, for_update=False, author_ids=author_ids)
     
     payload = {
         "parent": {"database_id": dbid},
         "properties": properties
     }
     
-    r = requests.post(url, headers=notion_headers(token), data=json.dumps(payload))
+    r = _notion_request("POST", url, token, payload)
+    fresh_ids = _refresh_stale_authors(r, token, authors_db, entry, author_ids, authors_index)
+    if fresh_ids is not None:
+        payload["properties"] = _build_properties(entry, for_update=False, author_ids=fresh_ids)
+        r = _notion_request("POST", url, token, payload)
     if not r.ok:
         raise Exception(f"Failed to create page: {r.status_code} {r.text}")
     
     page_id = r.json()["id"]
-    print(f"✅ [NOTION] Created page: {entry.get('title', 'Untitled')[:50]}...")
+    _cache_store("uid_map", dbid, {entry["uid"]: page_id})
+    _count("pages_created")
+    log.debug("✅ [NOTION] Created page: %s...", entry.get('title', 'Untitled')[:50])
     return page_id
 
-def notion_update_page(token: str, page_id: str, entry: Dict, authors_db: Optional[str], skip_author=False) -> None:
-    """Update an existing page in Notion."""
-    url = f"{NOTION_API_BASE}/pages/{page_id}"
-    
-    properties = {
-        "Title": {"title": [{"text": {"content": entry.get("title", "Untitled")}}]},
-        "Type": {"select": {"name": "Resource"}},
-        "PubType": {"select": {"name": entry.get("type_norm", "Other")}},
-        "Year": {"number": entry.get("year")},
-        "Venue": {"rich_text": [{"text": {"content": entry.get("venue", "")}}]},
-    }
-    
-    if entry.get("doi"):
-        doi_url = f"https://doi.org/{entry['doi']}" if not entry["doi"].startswith("http") else entry["doi"]
-        properties["DOI"] = {"url": doi_url}
+def _patch_key(page_id: str, properties: Dict[str, Any]) -> Tuple[str, bytes]:
+    if _ORJSON_AVAILABLE:
+        encoded = orjson.dumps(properties, option=orjson.OPT_SORT_KEYS)
+    else:
+        encoded = json.dumps(properties, sort_keys=True).encode("utf-8")
+    return page_id, hashlib.blake2b(encoded, digest_size=8).digest()
+
+def _already_patched(key: Tuple[str, bytes]) -> bool:
+    with _PATCH_LOCK:
+        return key in _PATCH_SEEN
+
+def _mark_patched(key: Tuple[str, bytes]) -> None:
+    with _PATCH_LOCK:
+        _PATCH_SEEN.add(key)
+
+def _property_value(name: str, prop: Dict[str, Any]) -> Any:
+    """Reduce a property (request payload or API response shape) to a comparable value."""
+    if "title" in prop or "rich_text" in prop:
+        texts = prop.get("title", prop.get("rich_text")) or []
+        return "".join(t.get("plain_text", t.get("text", {}).get("content", "")) for t in texts).strip()
+    if "select" in prop:
+        return (prop["select"] or {}).get("name")
+    if "number" in prop:
+        return prop["number"]
+    if "url" in prop:
+        url = (prop["url"] or "").strip()
+        return url.lower() if name == "DOI" else url
+    if "relation" in prop:
+        # A truncated relation cannot prove equality, so never match it
+        if prop.get("has_more"):
+            return None
+        return frozenset(r["id"].replace("-", "") for r in prop["relation"])
+    return object()
+
+def _properties_unchanged(properties: Dict[str, Dict], current: Dict[str, Dict]) -> bool:
+    """True if every property about to be sent already has that value on the page."""
+    for name, prop in properties.items():
+        if name not in current or _property_value(name, prop) != _property_value(name, current[name]):
+            return False
+    return True
+
+def notion_update_page(token: str, page_id: str, entry: Dict, authors_db: Optional[str], skip_author=False,
+                       authors_index: Optional[Dict[str, str]] = None,
+                       current: Optional[Dict[str, Any]] = None) -> None:
+    """Update an existing page in Notion.
     
-    if entry.get("url"):
-        properties["URL"] = {"url": entry["url"]}
+    ``current`` holds the page's properties as last fetched (see
+    ``notion_query_by_uids``); when nothing would change the PATCH is skipped.
+    Raises ``NotionPageGone`` if the page was deleted or archived.
+    """
+    url = f"{NOTION_API_BASE}/pages/{page_id}"
     
     # Add authors if present (as relation if authors_db is provided)
+    author_ids = None
     if entry.get("authors") and not skip_author and authors_db:
-        author_relation_ids = []
-        for author in entry["authors"]:
-            author_id = notion_find_or_create_author(token, authors_db, author["full"])
-            if author_id:
-                author_relation_ids.append(author_id)
-        if author_relation_ids:
-            properties["Authors"] = {"relation": [{"id": aid} for aid in author_relation_ids]}
+        author_ids = notion_author_relation_ids(token, authors_db, entry["authors"], authors_index)
+    properties = _build_properties(entry, for_update=True, author_ids=author_ids)
+    
+    if current is not None and _properties_unchanged(properties, current):
+        _count("updates_unchanged")
+        log.debug("⏭️  [NOTION] Unchanged, skipped update: %s...", entry.get('title', 'Untitled')[:50])
+        return
+    patch_key = _patch_key(page_id, properties)
+    if _already_patched(patch_key):
+        _count("updates_duplicate")
+        log.debug("⏭️  [NOTION] Identical update already sent: %s...", entry.get('title', 'Untitled')[:50])
+        return
     
     payload = {"properties": properties}
     
-    r = requests.patch(url, headers=notion_headers(token), data=json.dumps(payload))
+    r = _notion_request("PATCH", url, token, payload)
+    fresh_ids = _refresh_stale_authors(r, token, authors_db, entry, author_ids, authors_index)
+    if fresh_ids is not None:
+        payload["properties"] = _build_properties(entry, for_update=True, author_ids=fresh_ids)
+        patch_key = _patch_key(page_id, payload["properties"])
+        r = _notion_request("PATCH", url, token, payload)
     if not r.ok:
+        if _page_gone(r):
+            # Stale mapping; the caller looks the UID up again or recreates the page
+            _cache_forget_page(page_id)
+            raise NotionPageGone(f"Page {page_id} is gone: {r.status_code} {r.text}")
         raise Exception(f"Failed to update page: {r.status_code} {r.text}")
+    _mark_patched(patch_key)
     
-    print(f"✅ [NOTION] Updated page: {entry.get('title', 'Untitled')[:50]}...")
+    _count("pages_updated")
+    log.debug("✅ [NOTION] Updated page: %s...", entry.get('title', 'Untitled')[:50])
+
+def notion_get_page_properties(token: str, page_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a page's current properties, or None if the GET fails.
+    
+    Raises ``NotionPageGone`` if the page was deleted or archived.
+    """
+    r = _notion_request("GET", f"{NOTION_API_BASE}/pages/{page_id}", token)
+    page = r.json() if r.ok else {}
+    if _page_gone(r) or page.get("archived") or page.get("in_trash"):
+        _cache_forget_page(page_id)
+        raise NotionPageGone(f"Page {page_id} is gone: {r.status_code}")
+    if not r.ok:
+        log.warning("⚠️  [NOTION] Could not fetch page properties: %s %s", r.status_code, r.text[:200])
+        return None
+    return page.get("properties", {})
 
 def notion_get_property(token: str, page_id: str, prop_name: str) -> Optional[str]:
-    """Get a specific property value from a Notion page."""
+    """Get a specific property value from a Notion page.
+    
+    This costs a full page GET; when the page's properties were already
+    fetched (``notion_query_by_uids``) use ``notion_property_value`` instead.
+    """
     url = f"{NOTION_API_BASE}/pages/{page_id}"
-    r = requests.get(url, headers=notion_headers(token))
+    r = _notion_request("GET", url, token)
     
     if not r.ok:
         return None
     
-    props = r.json().get("properties", {})
-    prop = props.get(prop_name, {})
+    return notion_property_value(r.json().get("properties", {}), prop_name)
+
+def notion_property_value(properties: Dict[str, Any], prop_name: str) -> Optional[str]:
+    """Read a rich_text or url property from already-fetched page properties."""
+    prop = properties.get(prop_name, {})
     
     if prop.get("type") == "rich_text":
         texts = prop.get("rich_text", [])
@@ -168,8 +691,11 @@ def notion_get_property(token: str, page_id: str, prop_name: str) -> Optional[st
     
     return None
 
-def notion_update_pdf_fields(token: str, page_id: str, drive_file_id: str, web_view_link: str) -> None:
-    """Update PDF-related fields in a Notion page."""
+def notion_update_pdf_fields(token: str, page_id: str, drive_file_id: str, web_view_link: str) -> bool:
+    """Update PDF-related fields in a Notion page.
+    
+    Returns False if an identical update was already sent this run.
+    """
     url = f"{NOTION_API_BASE}/pages/{page_id}"
     
     properties = {
@@ -179,19 +705,47 @@ def notion_update_pdf_fields(token: str, page_id: str, drive_file_id: str, web_v
     if web_view_link:
         properties["PDF (Drive)"] = {"url": web_view_link}
     
+    patch_key = _patch_key(page_id, properties)
+    if _already_patched(patch_key):
+        _count("pdf_fields_skipped")
+        log.debug("⏭️  [NOTION] Identical PDF field update already sent")
+        return False
+    
     payload = {"properties": properties}
     
-    r = requests.patch(url, headers=notion_headers(token), data=json.dumps(payload))
+    r = _notion_request("PATCH", url, token, payload)
     if not r.ok:
         raise Exception(f"Failed to update PDF fields: {r.status_code} {r.text}")
+    _mark_patched(patch_key)
+    
+    _count("pdf_fields_updated")
+    log.debug("✅ [NOTION] Updated PDF fields for page")
+    return True
+
+def notion_upsert_pdf_fields(token: str, page_id: str, drive_file_id: str, web_view_link: str,
+                             current_drive_id: Optional[str] = None) -> bool:
+    """Update PDF fields unless the page already points at ``drive_file_id``.
     
-    print(f"✅ [NOTION] Updated PDF fields for page")
+    ``current_drive_id`` is the page's known "Drive File ID" (e.g. from
+    prefetched properties). Returns True if a PATCH was sent.
+    """
+    if current_drive_id and current_drive_id == drive_file_id:
+        _count("pdf_fields_skipped")
+        log.debug("⏭️  [NOTION] PDF fields already up to date")
+        return False
+    return notion_update_pdf_fields(token, page_id, drive_file_id, web_view_link)
+
+# Notion accepts at most 100 children per append request
+_MAX_CHILDREN = 100
 
 def notion_add_blocks(token: str, page_id: str, blocks: List[Dict]) -> None:
-    """Add blocks to a Notion page."""
+    """Add blocks to a Notion page, appending them in order 100 at a time."""
     url = f"{NOTION_API_BASE}/blocks/{page_id}/children"
-    payload = {"children": blocks}
     
-    r = requests.patch(url, headers=notion_headers(token), data=json.dumps(payload))
-    if not r.ok:
-        raise Exception(f"Failed to add blocks: {r.status_code} {r.text}")
+    # Appends to one page must not interleave, so batches go out one by one
+    # on the shared keep-alive session rather than concurrently
+    for start in range(0, len(blocks), _MAX_CHILDREN):
+        payload = {"children": blocks[start:start + _MAX_CHILDREN]}
+        r = _notion_request("PATCH", url, token, payload)
+        if not r.ok:
+            raise Exception(f"Failed to add blocks {start + 1}-{start + len(payload['children'])}: {r.status_code} {r.text}")
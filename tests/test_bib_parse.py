@@ -0,0 +1,95 @@
+"""Regression checks for the BibTeX tokenizer against bibtexparser 1.4.1 output."""
+import unittest
+
+from main import _fast_parse_bib
+
+try:
+    import bibtexparser
+    from bibtexparser.bparser import BibTexParser
+    _BIBTEXPARSER_AVAILABLE = True
+except ImportError:
+    _BIBTEXPARSER_AVAILABLE = False
+
+WRAPPED_BIB = """@article{smith2020,
+  title = {A {Deep} Study of
+           Things},
+  author = "Smith, John and
+     Doe, Jane",
+  journal = {Journal} # "  of
+     Stuff",
+  note = {{}},
+  year = 2020
+}
+
+@misc{tabs,
+  title = {Line one
+\t\t  line two\r\n   line three},
+  author = {Roe, Richard}
+}
+"""
+
+# What bibtexparser 1.4.1 (common_strings=True) produced for WRAPPED_BIB
+EXPECTED = [
+    {'ENTRYTYPE': 'article', 'ID': 'smith2020', 'title': 'A {Deep} Study of\nThings',
+     'author': 'Smith, John and\nDoe, Jane', 'journal': 'Journal  of\nStuff', 'note': '', 'year': '2020'},
+    {'ENTRYTYPE': 'misc', 'ID': 'tabs', 'title': 'Line one\nline two\nline three',
+     'author': 'Roe, Richard'},
+]
+
+DECLARATIONS_BIB = r"""@string{jml = {Journal of ML}}
+@STRING(conf = "Proc. Conf")
+@preamble{"\newcommand{\noop}[1]{}"}
+
+@comment{ Old entry: @article{bad, title={Bad}} }
+
+@article(paren2021,
+  title = {Parenthesized {Entry}},
+  journal = jml,
+  month = jan,
+  year = 2021
+)
+
+@inproceedings{macro2022,
+  title = {Macro Venue},
+  booktitle = conf # " 2022",
+  year = 2022
+}
+"""
+
+# What bibtexparser 1.4.1 (common_strings=True) produced for DECLARATIONS_BIB
+EXPECTED_DECLARATIONS = [
+    {'ENTRYTYPE': 'article', 'ID': 'paren2021', 'title': 'Parenthesized {Entry}',
+     'journal': 'Journal of ML', 'month': 'January', 'year': '2021'},
+    {'ENTRYTYPE': 'inproceedings', 'ID': 'macro2022', 'title': 'Macro Venue',
+     'booktitle': 'Proc. Conf 2022', 'year': '2022'},
+]
+
+def _fields(entries):
+    return [{k: v for k, v in e.items() if not k.startswith('_')} for e in entries]
+
+class WrappedFieldTest(unittest.TestCase):
+    def test_continuation_indentation_is_stripped(self):
+        self.assertEqual(_fields(_fast_parse_bib(WRAPPED_BIB)), EXPECTED)
+
+    @unittest.skipUnless(_BIBTEXPARSER_AVAILABLE, "bibtexparser not installed")
+    def test_matches_bibtexparser(self):
+        reference = bibtexparser.loads(WRAPPED_BIB, BibTexParser(common_strings=True)).entries
+        self.assertEqual(_fields(_fast_parse_bib(WRAPPED_BIB)), reference)
+
+class DeclarationTest(unittest.TestCase):
+    def test_strings_comments_and_paren_entries(self):
+        self.assertEqual(_fields(_fast_parse_bib(DECLARATIONS_BIB)), EXPECTED_DECLARATIONS)
+
+    def test_undefined_macro_is_kept_with_warning(self):
+        with self.assertLogs('main', level='WARNING') as logs:
+            entries = _fast_parse_bib("@article{k, title = {T}, journal = nomacro}\n")
+        self.assertEqual(entries[0]['journal'], 'nomacro')
+        self.assertIn('nomacro', logs.output[0])
+
+    @unittest.skipUnless(_BIBTEXPARSER_AVAILABLE, "bibtexparser not installed")
+    def test_declarations_match_bibtexparser(self):
+        reference = bibtexparser.loads(DECLARATIONS_BIB, BibTexParser(common_strings=True)).entries
+        self.assertEqual(_fields(_fast_parse_bib(DECLARATIONS_BIB)), reference)
+
+if __name__ == "__main__":
+    unittest.main()